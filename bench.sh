@@ -0,0 +1,3 @@
+#!/bin/sh
+
+python3 src/benchmark.py "$@"
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import threading
+
+from conversion import BlockType, INLINE_PATTERN, block_to_block_type, compiled, markdown_to_blocks
+from linkindex import resolve_reference
+from output import atomic_write
+
+ASSETS_DIR = "assets"
+MANIFEST_NAME = "manifest.json"
+DIGEST_LENGTH = 16
+FICLONE = 0x40049409
+
+def file_signature(stat):
+    return [stat.st_mtime_ns, stat.st_size]
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for chunk in iter(lambda: fp.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def reflink(source_fd, destination_fd):
+    import fcntl
+    fcntl.ioctl(destination_fd, FICLONE, source_fd)
+
+def copy_file_range(source_fd, destination_fd, count):
+    return os.copy_file_range(source_fd, destination_fd, count)
+
+def sendfile(source_fd, destination_fd, count):
+    return os.sendfile(destination_fd, source_fd, None, count)
+
+def copy_range(copy, source_fd, destination_fd, size):
+    copied = 0
+    while copied < size:
+        count = copy(source_fd, destination_fd, size - copied)
+        if count == 0:
+            break
+        copied += count
+
+def copy_file(source, destination):
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        try:
+            reflink(src.fileno(), dst.fileno())
+            return
+        except (ImportError, OSError):
+            pass
+        size = os.fstat(src.fileno()).st_size
+        for copy in (copy_file_range, sendfile):
+            try:
+                copy_range(copy, src.fileno(), dst.fileno(), size)
+                return
+            except (AttributeError, OSError):
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+        shutil.copyfileobj(src, dst)
+
+def temp_name(path):
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+def place_file(source, destination, link=True):
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    temp_path = temp_name(destination)
+    try:
+        if not link:
+            raise OSError("hardlink not allowed")
+        os.link(source, temp_path)
+    except OSError:
+        copy_file(source, temp_path)
+    os.replace(temp_path, destination)
+
+def asset_name(path, digest):
+    stem, extension = posixpath.splitext(posixpath.basename(path))
+    return f"{ASSETS_DIR}/{stem}.{digest[:DIGEST_LENGTH]}{extension}"
+
+class AssetStore():
+    def __init__(self, content_dir, output_dir, directory=None):
+        self.content_dir = content_dir
+        self.output_dir = output_dir
+        self.directory = directory
+        self.entries = None
+        self.used = set()
+        self.placed = 0
+        self.unchanged = 0
+        self.missing = 0
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f"AssetStore({self.content_dir}, {self.output_dir}, {self.directory}, placed={self.placed}, unchanged={self.unchanged})"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["lock"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def load(self):
+        with self.lock:
+            if self.entries is None:
+                entries = {}
+                if self.directory is not None:
+                    try:
+                        with open(os.path.join(self.directory, MANIFEST_NAME), encoding="utf-8") as fp:
+                            entries = json.load(fp)
+                    except FileNotFoundError:
+                        pass
+                self.entries = entries
+            return self.entries
+
+    def save(self):
+        if self.directory is not None and self.entries is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            atomic_write(os.path.join(self.directory, MANIFEST_NAME), json.dumps(self.entries, sort_keys=True).encode("utf-8"))
+
+    def object_path(self, digest):
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def store(self, source, digest):
+        if self.directory is None:
+            return source
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = temp_name(path)
+            copy_file(source, temp_path)
+            os.replace(temp_path, path)
+        return path
+
+    def asset(self, path):
+        source = os.path.join(self.content_dir, path)
+        try:
+            stat = os.stat(source)
+        except FileNotFoundError:
+            with self.lock:
+                self.missing += 1
+            return None
+        entries = self.load()
+        signature = file_signature(stat)
+        with self.lock:
+            entry = entries.get(path)
+        if entry is not None and entry[:2] == signature:
+            name = asset_name(path, entry[2])
+            if os.path.exists(os.path.join(self.output_dir, name)):
+                with self.lock:
+                    self.used.add(name)
+                    self.unchanged += 1
+                return name
+            digest = entry[2]
+        else:
+            digest = file_digest(source)
+            with self.lock:
+                entries[path] = signature + [digest]
+        name = asset_name(path, digest)
+        destination = os.path.join(self.output_dir, name)
+        if os.path.exists(destination):
+            with self.lock:
+                self.used.add(name)
+                self.unchanged += 1
+            return name
+        place_file(self.store(source, digest), destination, self.directory is not None)
+        with self.lock:
+            self.used.add(name)
+            self.placed += 1
+        return name
+
+    def url(self, page, url):
+        path = resolve_reference(page, url)
+        if path is None:
+            return url
+        name = self.asset(path)
+        if name is None:
+            return url
+        return posixpath.relpath(name, posixpath.dirname(page) or ".")
+
+    def rewrite_block(self, page, block, urls=None):
+        pieces = []
+        position = 0
+        for found in compiled(INLINE_PATTERN, re.DOTALL).finditer(block):
+            if found.lastgroup != "image_url" or "\n" in found[0]:
+                continue
+            start, end = found.span("image_url")
+            url = self.url(page, found["image_url"])
+            if urls is not None:
+                urls[url] = found["image_url"]
+            pieces.append(block[position:start])
+            pieces.append(url)
+            position = end
+        if not pieces:
+            return block
+        pieces.append(block[position:])
+        return "".join(pieces)
+
+    def rewrite(self, page, markdown, urls=None):
+        if "![" not in markdown:
+            return markdown
+        blocks = markdown_to_blocks(markdown)
+        for i, block in enumerate(blocks):
+            if "![" in block and block_to_block_type(block) != BlockType.CODE:
+                blocks[i] = self.rewrite_block(page, block, urls)
+        return "\n\n".join(blocks)
+
+    def merge(self, other):
+        entries = self.load()
+        with self.lock:
+            if other.entries:
+                entries.update(other.entries)
+            self.used.update(other.used)
+            self.placed += other.placed
+            self.unchanged += other.unchanged
+            self.missing += other.missing
+
+    def prune(self):
+        directory = os.path.join(self.output_dir, ASSETS_DIR)
+        if not os.path.isdir(directory):
+            return 0
+        removed = 0
+        for name in os.listdir(directory):
+            if f"{ASSETS_DIR}/{name}" not in self.used:
+                os.remove(os.path.join(directory, name))
+                removed += 1
+        return removed
+
+    def report(self):
+        return f"assets: {self.placed} placed, {self.unchanged} unchanged, {self.missing} missing"
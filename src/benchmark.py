@@ -0,0 +1,307 @@
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from textnode import TextNode, TextType
+from leafnode import LeafNode
+from parentnode import ParentNode
+from conversion import *
+import nodeformat
+
+DEFAULT_THRESHOLD = 10.0
+
+WORDS = ["static", "site", "generator", "markdown", "node", "block", "page", "render", "build", "content"]
+
+def multipass_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+def make_paragraph(rng, links=4):
+    parts = []
+    for i in range(links):
+        parts.append(" ".join(rng.choice(WORDS) for _ in range(8)))
+        match rng.randrange(5):
+            case 0:
+                parts.append(f"**{rng.choice(WORDS)}**")
+            case 1:
+                parts.append(f"_{rng.choice(WORDS)}_")
+            case 2:
+                parts.append(f"`{rng.choice(WORDS)}`")
+            case 3:
+                parts.append(f"![{rng.choice(WORDS)}](/images/{i}.png)")
+            case 4:
+                parts.append(f"[{rng.choice(WORDS)}](https://example.com/{i})")
+    return " ".join(parts)
+
+def make_corpus(paragraphs, links=4, seed=0):
+    rng = random.Random(seed)
+    return [make_paragraph(rng, links) for _ in range(paragraphs)]
+
+def time_call(function, corpus):
+    start = time.perf_counter()
+    for text in corpus:
+        function(text)
+    return time.perf_counter() - start
+
+def bench_inline(paragraphs=50000, links=4):
+    corpus = make_corpus(paragraphs, links)
+    size = sum(map(len, corpus)) / 1e6
+    for name, function in (("multipass", multipass_text_to_textnodes), ("single pass", text_to_textnodes)):
+        elapsed = time_call(function, corpus)
+        print(f"text_to_textnodes {name:>12}: {paragraphs / elapsed:10.0f} paragraphs/s {size / elapsed:6.2f} MB/s")
+
+def regex_block_to_block_type(block):
+    if not block:
+        return None
+    if len(re.findall(r"^(#{1,6})\s+.+$",block)) > 0:
+        return BlockType.HEADING
+    if len(re.findall(r"^```.+```$",block, re.DOTALL)) > 0:
+        return BlockType.CODE
+    if len(re.findall(r"^>\s?.+$",block, re.MULTILINE)) == len(block.split("\n")):
+        return BlockType.QUOTE
+    if len(re.findall(r"^\s*[-+*]\s+.+$",block, re.MULTILINE)) == len(block.split("\n")):
+        return BlockType.UNORDERED_LIST
+    if len(re.findall(r"^\s*\d+[.)]\s+.+$",block, re.MULTILINE)) == len(block.split("\n")):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+def make_block(rng):
+    words = lambda count: " ".join(rng.choice(WORDS) for _ in range(count))
+    lines = rng.randrange(1, 8)
+    match rng.randrange(8):
+        case 0:
+            return f"{'#' * rng.randrange(1, 7)} {words(4)}"
+        case 1:
+            return "```\n" + "\n".join(words(6) for _ in range(lines)) + "\n```"
+        case 2:
+            return "\n".join(f"> {words(8)}" for _ in range(lines))
+        case 3:
+            return "\n".join(f"- {words(5)}" for _ in range(lines))
+        case 4:
+            return "\n".join(f"{i + 1}. {words(5)}" for i in range(lines))
+        case _:
+            return "\n".join(words(12) for _ in range(lines))
+
+def make_blocks(count, seed=0):
+    rng = random.Random(seed)
+    return [make_block(rng) for _ in range(count)]
+
+def bench_blocks(count=200000):
+    blocks = make_blocks(count)
+    for name, function in (("regex findall", regex_block_to_block_type), ("precompiled", block_to_block_type)):
+        elapsed = time_call(function, blocks)
+        print(f"block_to_block_type {name:>13}: {count / elapsed:10.0f} blocks/s")
+
+class DictTextNode(TextNode):
+    pass
+
+class DictLeafNode(LeafNode):
+    pass
+
+def bytes_per_node(factory, count=10000):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        nodes = [factory(i) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del nodes
+    return (after - before) / count
+
+def bench_memory(count=10000):
+    text = "shared text"
+    cases = (
+        ("TextNode", lambda i: DictTextNode(text, TextType.TEXT), lambda i: TextNode(text, TextType.TEXT)),
+        ("LeafNode", lambda i: DictLeafNode(None, text, {}), lambda i: LeafNode(None, text)),
+    )
+    for name, before, after in cases:
+        print(f"{name:>8} bytes/node: {bytes_per_node(before, count):6.1f} with __dict__, {bytes_per_node(after, count):6.1f} slotted")
+
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_nodeformat(paragraphs=2000, repeat=5):
+    corpus = make_corpus(paragraphs, 20)
+    text = " ".join(corpus)
+    markdown = "\n\n".join(corpus)
+    cases = (
+        ("text_to_textnodes", lambda: text_to_textnodes(text), False),
+        ("text_to_textnodes", lambda: text_to_textnodes(text), True),
+        ("markdown_to_html_node", lambda: markdown_to_html_node(markdown), False),
+        ("markdown_to_html_node", lambda: markdown_to_html_node(markdown), True),
+    )
+    for name, parse, lazy in cases:
+        data = nodeformat.dumps(parse())
+        parsed = best_time(parse, repeat)
+        loaded = best_time(lambda: nodeformat.loads(data, lazy), repeat)
+        label = "lazy load" if lazy else "load"
+        print(f"{name:>21}: parse {parsed * 1000:8.1f} ms, {label} {loaded * 1000:8.1f} ms ({parsed / loaded:.1f}x), {len(data)} bytes")
+    tree = markdown_to_html_node(markdown)
+    view = nodeformat.loads(nodeformat.dumps(tree), lazy=True)
+    rendered = best_time(tree.to_html, repeat)
+    streamed = best_time(view.to_html, repeat)
+    print(f"{'to_html':>21}: tree {rendered * 1000:8.1f} ms, lazy view {streamed * 1000:8.1f} ms")
+
+def time_command(command, repeat=10):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=False, stdout=subprocess.DEVNULL)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def bench_startup(repeat=10):
+    main_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "page.md")
+        with open(path, "w", encoding="utf-8") as fp:
+            fp.write("# Title\n\nSome **bold** text\n\n- item\n- item")
+        cases = (
+            ("python3 -c pass", [sys.executable, "-c", "pass"]),
+            ("main.py --version", [sys.executable, main_path, "--version"]),
+            ("main.py check FILE", [sys.executable, main_path, "check", path]),
+            ("main.py build --help", [sys.executable, main_path, "build", "--help"]),
+        )
+        for name, command in cases:
+            print(f"{name:>22}: {time_command(command, repeat) * 1000:7.1f} ms")
+
+def bench_batch(paragraphs=20000, repeat=5):
+    nodes = [node for paragraph in make_corpus(paragraphs) for node in text_to_textnodes(paragraph)]
+    blocks = make_blocks(paragraphs)
+    cases = (
+        ("text nodes", nodes, lambda items: [text_node_to_html_node(item) for item in items], text_nodes_to_html_nodes),
+        ("blocks", blocks, lambda items: [block_to_html_node(item) for item in items], blocks_to_html_nodes),
+    )
+    for name, items, loop, batch in cases:
+        for label, function in (("loop", loop), ("batch", batch)):
+            elapsed = best_time(lambda: function(items), repeat)
+            print(f"{name:>10} {label:>5}: {len(items) / elapsed:10.0f} items/s")
+
+def make_nested_list(rng, depth, width):
+    if depth == 0:
+        return LeafNode("span", " ".join(rng.choice(WORDS) for _ in range(3)))
+    items = [ParentNode("li", [make_nested_list(rng, depth - 1, width)]) for _ in range(width)]
+    return ParentNode("ul", items)
+
+def make_code_fence_document(rng, lines):
+    code = "\n\n".join(" ".join(rng.choice(WORDS) for _ in range(10)) for _ in range(lines))
+    return f"# Listing\n\nSome prose first.\n\n```\n{code}\n```\n\nSome prose after."
+
+def make_small_document(rng):
+    blocks = [make_block(rng) for _ in range(rng.randrange(2, 6))]
+    return "\n\n".join(blocks)
+
+def make_suite(scale=1.0, seed=0):
+    rng = random.Random(seed)
+    count = lambda n: max(1, int(n * scale))
+    link_dense = [make_paragraph(rng, 200) for _ in range(count(50))]
+    small_files = [make_small_document(rng) for _ in range(count(5000))]
+    code_fences = [make_code_fence_document(rng, 20000) for _ in range(count(2))]
+    blocks = make_blocks(count(50000), seed)
+    deep_list = make_nested_list(rng, 400, 1)
+    for _ in range(count(50)):
+        deep_list = ParentNode("ul", [ParentNode("li", [deep_list])])
+    wide_list = [make_nested_list(rng, 1, count(20000))]
+    nested_lists = [make_nested_list(rng, 6, 5)]
+    return {
+        "text_to_textnodes/link_dense": (text_to_textnodes, link_dense, len),
+        "text_to_textnodes/small_files": (text_to_textnodes, [block for document in small_files for block in markdown_to_blocks(document)], len),
+        "markdown_to_blocks/small_files": (markdown_to_blocks, small_files, len),
+        "markdown_to_blocks/code_fences": (markdown_to_blocks, code_fences, len),
+        "block_to_block_type/mixed": (block_to_block_type, blocks, len),
+        "to_html/nested_lists": (ParentNode.to_html, nested_lists, lambda node: len(node.to_html())),
+        "to_html/deep_list": (ParentNode.to_html, [deep_list], lambda node: len(node.to_html())),
+        "to_html/wide_list": (ParentNode.to_html, wide_list, lambda node: len(node.to_html())),
+    }
+
+def run_suite(scale=1.0, repeat=3):
+    results = {}
+    for name, (function, corpus, size) in make_suite(scale).items():
+        size = sum(map(size, corpus))
+        elapsed = min(time_call(function, corpus) for _ in range(repeat))
+        results[name] = {"seconds": elapsed, "bytes": size, "mb_per_second": size / elapsed / 1e6}
+    return results
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    regressions = []
+    for name, expected in baseline.items():
+        if name not in results:
+            continue
+        change = (results[name]["mb_per_second"] / expected["mb_per_second"] - 1) * 100
+        if change < -threshold:
+            regressions.append((name, change))
+    return regressions
+
+def format_results(results, baseline=None):
+    lines = []
+    for name, result in results.items():
+        line = f"{name:<34} {result['mb_per_second']:10.2f} MB/s"
+        if baseline is not None and name in baseline:
+            line += f" {(result['mb_per_second'] / baseline[name]['mb_per_second'] - 1) * 100:+8.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="benchmark.py")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply corpus sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the best is kept")
+    parser.add_argument("--save", metavar="PATH", help="write results to PATH as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="fail if throughput dropped against the JSON baseline at PATH")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed throughput drop in percent")
+    parser.add_argument("--pipelines", action="store_true", help="compare against the previous pipeline implementations")
+    parser.add_argument("--startup", action="store_true", help="time cold starts of the command line")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        bench_startup()
+        return 0
+
+    if args.pipelines:
+        paragraphs = int(50000 * args.scale)
+        bench_inline(paragraphs)
+        bench_inline(max(1, paragraphs // 100), links=500)
+        bench_blocks(paragraphs * 4)
+        bench_memory()
+        bench_nodeformat(max(1, paragraphs // 25))
+        bench_batch(max(1, paragraphs // 2))
+        return 0
+
+    results = run_suite(args.scale, args.repeat)
+    baseline = None
+    if args.compare is not None:
+        with open(args.compare, encoding="utf-8") as fp:
+            baseline = json.load(fp)
+    print(format_results(results, baseline))
+    if args.save is not None:
+        with open(args.save, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+    if baseline is not None:
+        regressions = compare_results(results, baseline, args.threshold)
+        for name, change in regressions:
+            print(f"regression: {name} {change:+.1f}% (threshold -{args.threshold}%)")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
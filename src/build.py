@@ -0,0 +1,254 @@
+import hashlib
+import os
+
+import profiling
+from conversion import markdown_to_html_node, page_analysis
+from defaults import DEFAULT_CHUNK_SIZE, DEFAULT_IO_CONCURRENCY
+from linkindex import analysis_references
+from memo import BlockMemo
+from output import OutputStage, write_if_changed
+from template import TITLE_SLOT, analysis_title, page_title
+
+worker_memo = None
+
+class BuildResult():
+    def __init__(self, pages=0, errors=None):
+        self.pages = pages
+        self.errors = [] if errors is None else errors
+        self.references = []
+        self.documents = []
+
+    def __repr__(self):
+        return f"BuildResult({self.pages}, {self.errors})"
+
+    def report(self):
+        lines = [f"built {self.pages} pages, {len(self.errors)} errors"]
+        for relative_path, message in self.errors:
+            lines.append(f"  {relative_path}: {message}")
+        return "\n".join(lines)
+
+def iter_markdown_files(content_dir):
+    for root, dirs, files in os.walk(content_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".md"):
+                yield os.path.relpath(os.path.join(root, name), content_dir)
+
+def html_path(relative_path):
+    return f"{relative_path[:-len('.md')]}.html"
+
+def render_markdown(markdown, cache=None, memo=None, template=None, analyze=False, max_length=None):
+    if cache is None:
+        root = markdown_to_html_node(markdown, memo, max_length)
+        analysis = page_analysis(root) if analyze else None
+        html = root.to_html()
+        if template is None:
+            return html, analysis
+        title = page_title(root)
+    else:
+        html, analysis = cache.render_page(markdown, memo, analyze or template is not None, max_length)
+        if template is None:
+            return html, analysis
+        title = analysis_title(analysis)
+    return template.render((html,), {TITLE_SLOT: title}), analysis
+
+def render_document(relative_path, markdown, cache=None, memo=None, template=None, analyze=False, max_length=None):
+    if profiling.active is None:
+        return render_markdown(markdown, cache, memo, template, analyze, max_length)
+    with profiling.active.document(relative_path, len(markdown)):
+        return render_markdown(markdown, cache, memo, template, analyze, max_length)
+
+def read_source(content_dir, relative_path):
+    with open(os.path.join(content_dir, relative_path), encoding="utf-8") as fp:
+        return fp.read()
+
+def read_page(content_dir, relative_path, assets=None):
+    markdown = read_source(content_dir, relative_path)
+    urls = {}
+    if assets is not None:
+        markdown = assets.rewrite(page_name(relative_path), markdown, urls)
+    return markdown, urls
+
+def write_page(output_dir, relative_path, html, output=None):
+    destination = os.path.join(output_dir, html_path(relative_path))
+    if output is None:
+        return write_if_changed(destination, html.encode("utf-8"))
+    return output.write(destination, html)
+
+def page_name(relative_path):
+    return relative_path.replace(os.sep, "/")
+
+def shard_of(page, count):
+    return int.from_bytes(hashlib.sha256(page.encode("utf-8")).digest()[:8], "big") % count
+
+def in_shard(relative_path, shard):
+    if shard is None:
+        return True
+    index, count = shard
+    return shard_of(page_name(relative_path), count) == index - 1
+
+def build_page(content_dir, output_dir, relative_path, cache=None, memo=None, analyze=False, output=None, template=None, assets=None, max_length=None):
+    markdown, urls = read_page(content_dir, relative_path, assets)
+    html, analysis = render_document(relative_path, markdown, cache, memo, template, analyze, max_length)
+    write_page(output_dir, relative_path, html, output)
+    if analyze:
+        return page_name(relative_path), analysis, urls
+    return None
+
+def add_analysis(result, page, analysis, urls, references, search, documents):
+    if references:
+        result.references.append((page, *analysis_references(page, analysis, urls)))
+    if search is not None:
+        search.add(page, html_path(page), analysis)
+    elif documents:
+        result.documents.append((page, analysis))
+
+def build_pages(content_dir, output_dir, relative_paths, cache=None, memo=None, references=False, output=None, template=None, assets=None, search=None, documents=False, max_length=None):
+    result = BuildResult()
+    analyze = references or documents or search is not None
+    for relative_path in relative_paths:
+        try:
+            record = build_page(content_dir, output_dir, relative_path, cache, memo, analyze, output, template, assets, max_length)
+        except Exception as e:
+            result.errors.append((relative_path, f"{type(e).__name__}: {e}"))
+        else:
+            result.pages += 1
+            if record is not None:
+                add_analysis(result, *record, references, search, documents)
+    return result
+
+def init_worker(memo_max_entries, profile):
+    global worker_memo
+    worker_memo = BlockMemo(memo_max_entries) if memo_max_entries > 0 else None
+    if profile:
+        profiling.enable()
+
+def build_chunk(content_dir, output_dir, relative_paths, cache, references, output, template, assets, documents, max_length):
+    memo = worker_memo
+    memo_hits, memo_misses, memo_entries = (memo.hits, memo.misses, 0) if memo is not None else (0, 0, 0)
+    cache_hits, cache_misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    result = build_pages(content_dir, output_dir, relative_paths, cache, memo, references, output, template, assets, documents=documents, max_length=max_length)
+    output.close()
+    if cache is not None:
+        cache_hits, cache_misses = cache.hits - cache_hits, cache.misses - cache_misses
+    if memo is not None:
+        memo_hits, memo_misses, memo_entries = memo.hits - memo_hits, memo.misses - memo_misses, len(memo.entries)
+    profiler = profiling.take() if profiling.active is not None else None
+    return result, (cache_hits, cache_misses), (memo_hits, memo_misses, os.getpid(), memo_entries), profiler, output, assets
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def build_parallel(content_dir, output_dir, relative_paths, cache, memo, references, output, template, assets, search, jobs, chunk_size, max_length):
+    from concurrent.futures import ProcessPoolExecutor
+    result = BuildResult()
+    memo_max_entries = memo.max_entries if memo is not None else 0
+    chunks = list(chunked(relative_paths, chunk_size))
+    profile = profiling.active is not None
+    with ProcessPoolExecutor(jobs, initializer=init_worker, initargs=(memo_max_entries, profile)) as executor:
+        outputs = executor.map(
+            build_chunk,
+            [content_dir] * len(chunks),
+            [output_dir] * len(chunks),
+            chunks,
+            [cache] * len(chunks),
+            [references] * len(chunks),
+            [OutputStage(output.compress, output.workers) for _ in chunks],
+            [template] * len(chunks),
+            [assets] * len(chunks),
+            [search is not None] * len(chunks),
+            [max_length] * len(chunks),
+        )
+        for chunk_result, (cache_hits, cache_misses), (memo_hits, memo_misses, worker, memo_entries), profiler, chunk_output, chunk_assets in outputs:
+            result.pages += chunk_result.pages
+            result.errors.extend(chunk_result.errors)
+            result.references.extend(chunk_result.references)
+            for page, analysis in chunk_result.documents:
+                search.add(page, html_path(page), analysis)
+            if cache is not None:
+                cache.hits += cache_hits
+                cache.misses += cache_misses
+            if memo is not None:
+                memo.hits += memo_hits
+                memo.misses += memo_misses
+                memo.worker_entries[worker] = memo_entries
+            output.merge(chunk_output)
+            if assets is not None:
+                assets.merge(chunk_assets)
+            if profiler is not None:
+                profiling.active.merge(profiler)
+    return result
+
+def finish_build(result, output_dir, relative_paths, cache, index, output, search, assets, shard):
+    output.close()
+    if assets is not None:
+        assets.prune()
+        assets.save()
+    if search is not None:
+        search.write(os.path.join(output_dir, "search"))
+    if cache is not None:
+        cache.evict()
+    if index is not None:
+        index.update(result.references)
+        owned = None if shard is None else lambda page: in_shard(page, shard)
+        index.prune(map(page_name, relative_paths), owned)
+    return result
+
+def build_site(content_dir, output_dir, cache=None, memo=None, jobs=1, chunk_size=None, index=None, output=None, search=None, shard=None, template=None, assets=None, max_length=None):
+    relative_paths = [relative_path for relative_path in iter_markdown_files(content_dir) if in_shard(relative_path, shard)]
+    references = index is not None or shard is not None
+    if output is None:
+        output = OutputStage()
+    if chunk_size is None:
+        chunk_size = max(1, min(DEFAULT_CHUNK_SIZE, len(relative_paths) // (jobs * 4)))
+    if jobs > 1 and len(relative_paths) > 1:
+        result = build_parallel(content_dir, output_dir, relative_paths, cache, memo, references, output, template, assets, search, jobs, chunk_size, max_length)
+    else:
+        result = build_pages(content_dir, output_dir, relative_paths, cache, memo, references, output, template, assets, search, max_length=max_length)
+    return finish_build(result, output_dir, relative_paths, cache, index, output, search, assets, shard)
+
+async def build_worker(queue, content_dir, output_dir, result, cache, memo, references, output, template, assets, search, io_executor, convert_executor, max_length):
+    import asyncio
+    loop = asyncio.get_running_loop()
+    analyze = references or search is not None
+    while True:
+        relative_path = await queue.get()
+        if relative_path is None:
+            return
+        try:
+            markdown, urls = await loop.run_in_executor(io_executor, read_page, content_dir, relative_path, assets)
+            html, analysis = await loop.run_in_executor(convert_executor, render_document, relative_path, markdown, cache, memo, template, analyze, max_length)
+            await loop.run_in_executor(io_executor, write_page, output_dir, relative_path, html, output)
+        except Exception as e:
+            result.errors.append((relative_path, f"{type(e).__name__}: {e}"))
+        else:
+            result.pages += 1
+            if analyze:
+                add_analysis(result, page_name(relative_path), analysis, urls, references, search, False)
+
+async def build_site_async(content_dir, output_dir, cache=None, memo=None, concurrency=DEFAULT_IO_CONCURRENCY, index=None, output=None, search=None, shard=None, template=None, assets=None, max_length=None):
+    import asyncio
+    from concurrent.futures import ThreadPoolExecutor
+    result = BuildResult()
+    relative_paths = []
+    references = index is not None or shard is not None
+    if output is None:
+        output = OutputStage()
+    queue = asyncio.Queue(maxsize=concurrency)
+    with ThreadPoolExecutor(concurrency) as io_executor, ThreadPoolExecutor(1) as convert_executor:
+        workers = [
+            asyncio.create_task(build_worker(queue, content_dir, output_dir, result, cache, memo, references, output, template, assets, search, io_executor, convert_executor, max_length))
+            for _ in range(concurrency)
+        ]
+        for relative_path in iter_markdown_files(content_dir):
+            if not in_shard(relative_path, shard):
+                continue
+            relative_paths.append(relative_path)
+            await queue.put(relative_path)
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    result.errors.sort()
+    result.references.sort()
+    return finish_build(result, output_dir, relative_paths, cache, index, output, search, assets, shard)
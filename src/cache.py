@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+
+from conversion import CONVERTER_VERSION, markdown_to_html_node, page_analysis
+from defaults import DEFAULT_MAX_BYTES, DEFAULT_MAX_INLINE_LENGTH
+
+PAGES_DIR = "pages"
+
+class BuildCache():
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"BuildCache({self.directory}, {self.max_bytes}, hits={self.hits}, misses={self.misses})"
+
+    def key(self, markdown, max_length=None):
+        digest = hashlib.sha256(CONVERTER_VERSION.encode("utf-8"))
+        if max_length not in (None, DEFAULT_MAX_INLINE_LENGTH):
+            digest.update(f"\0{max_length}".encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(markdown.encode("utf-8"))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, PAGES_DIR, key[:2], f"{key}.html")
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, encoding="utf-8") as fp:
+                html = fp.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        os.utime(path)
+        self.hits += 1
+        return html
+
+    def analysis_path(self, key):
+        return os.path.join(self.directory, PAGES_DIR, key[:2], f"{key}.json")
+
+    def get_analysis(self, key):
+        try:
+            with open(self.analysis_path(key), encoding="utf-8") as fp:
+                return json.load(fp)
+        except FileNotFoundError:
+            return None
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as fp:
+            fp.write(text)
+        os.replace(temp_path, path)
+
+    def put(self, key, html):
+        self.write(self.path(key), html)
+
+    def put_analysis(self, key, analysis):
+        self.write(self.analysis_path(key), json.dumps(analysis))
+
+    def render_page(self, markdown, memo=None, analyze=False, max_length=None):
+        key = self.key(markdown, max_length)
+        html = self.get(key)
+        if html is not None:
+            if not analyze:
+                return html, None
+            analysis = self.get_analysis(key)
+            if analysis is not None:
+                return html, analysis
+        root = markdown_to_html_node(markdown, memo, max_length)
+        if html is None:
+            html = root.to_html()
+            self.put(key, html)
+        analysis = None
+        if analyze:
+            analysis = page_analysis(root)
+            self.put_analysis(key, analysis)
+        return html, analysis
+
+    def render(self, markdown, memo=None):
+        return self.render_page(markdown, memo)[0]
+
+    def evict(self):
+        entries = []
+        total = 0
+        for root, _, files in os.walk(os.path.join(self.directory, PAGES_DIR)):
+            for name in files:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        entries.sort()
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def report(self):
+        return f"cache: {self.hits} hits, {self.misses} misses"
@@ -1,9 +1,22 @@
 import re
+from collections import Counter
 from enum import Enum
+from functools import cache
+from defaults import DEFAULT_MAX_INLINE_LENGTH
 from leafnode import LeafNode
+from parentnode import ParentNode
 from htmlnode import HTMLNode
 from textnode import TextNode, TextType
 
+CONVERTER_VERSION = "4"
+
+@cache
+def compiled(pattern, flags=0):
+    return re.compile(pattern, flags)
+
+class InlineSyntaxError(ValueError):
+    pass
+
 class BlockType(Enum):
     PARAGRAPH = "paragraph"
     HEADING = "heading"
@@ -15,7 +28,7 @@ class BlockType(Enum):
 def text_node_to_html_node(text_node):
     if text_node.text_type not in TextType:
         raise ValueError("Text Type not recognized")
-    props = {}
+    props = None
     text = text_node.text
     match text_node.text_type:
         case TextType.TEXT:
@@ -28,16 +41,37 @@ def text_node_to_html_node(text_node):
             tag = "code"
         case TextType.LINK:
             tag = "a"
-            props["href"] = text_node.url
+            props = {"href": text_node.url}
         case TextType.IMAGE:
             tag = "img"
             text = ""
-            props["src"] = text_node.url
-            props["alt"] = text_node.text
+            props = {"src": text_node.url, "alt": text_node.text}
         case _:
             raise NotImplementedError("Text Type value recognized but not handled")
     return LeafNode(tag, text, props)
 
+PLAIN_TAGS = {
+    TextType.TEXT: None,
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+}
+
+def text_nodes_to_html_nodes(text_nodes):
+    html_nodes = [None] * len(text_nodes)
+    plain_tags = PLAIN_TAGS
+    for i, text_node in enumerate(text_nodes):
+        text_type = text_node.text_type
+        if text_type in plain_tags:
+            html_nodes[i] = LeafNode(plain_tags[text_type], text_node.text)
+        elif text_type is TextType.LINK:
+            html_nodes[i] = LeafNode("a", text_node.text, {"href": text_node.url})
+        elif text_type is TextType.IMAGE:
+            html_nodes[i] = LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        else:
+            raise ValueError("Text Type not recognized")
+    return html_nodes
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     processed_nodes = []
     for node in old_nodes:
@@ -47,7 +81,7 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         elif delimiter in node.text:
             sections = node.text.split(delimiter)
             if len(sections) % 2 != 1:
-                raise Exception("There must be an even number of delimeters")
+                raise InlineSyntaxError("There must be an even number of delimeters")
             for i in range(len(sections)):
                 if sections[i] == "":
                     continue
@@ -60,81 +94,326 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
             processed_nodes.append(node)
     return processed_nodes
 
+IMAGE_PATTERN = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
+LINK_PATTERN = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
+
 def extract_markdown_images(text):
-    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return compiled(IMAGE_PATTERN).findall(text)
 
 def extract_markdown_links(text):
-    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    return compiled(LINK_PATTERN).findall(text)
 
-def split_nodes_image(old_nodes):
+def split_nodes_pattern(old_nodes, pattern, text_type):
     processed_nodes = []
     for node in old_nodes:
         if node.text_type != TextType.TEXT:
             processed_nodes.append(node)
             continue
         text = node.text
-        matches = extract_markdown_images(node.text)
-        for match in matches:
-            split = text.split(f"![{match[0]}]({match[1]})")
-            if split[0] != "":
-                processed_nodes.append(TextNode(split[0], TextType.TEXT))
-            processed_nodes.append(TextNode(match[0], TextType.IMAGE, match[1]))
-            text = split[1]
-        if len(matches) == 0:
+        position = 0
+        for found in compiled(pattern).finditer(text):
+            if found.start() > position:
+                processed_nodes.append(TextNode(text[position:found.start()], TextType.TEXT))
+            processed_nodes.append(TextNode(found[1], text_type, found[2]))
+            position = found.end()
+        if position == 0:
             processed_nodes.append(node)
-        elif text != "":
-            processed_nodes.append(TextNode(text,TextType.TEXT))
+        elif position < len(text):
+            processed_nodes.append(TextNode(text[position:], TextType.TEXT))
     return processed_nodes
 
+def split_nodes_image(old_nodes):
+    return split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
+
 def split_nodes_link(old_nodes):
-    processed_nodes = []
-    for node in old_nodes:
-        if node.text_type != TextType.TEXT:
-            processed_nodes.append(node)
-            continue
-        text = node.text
-        matches = extract_markdown_links(node.text)
-        for match in matches:
-            split = text.split(f"[{match[0]}]({match[1]})")
-            if split[0] != "":
-                processed_nodes.append(TextNode(split[0], TextType.TEXT))
-            processed_nodes.append(TextNode(match[0], TextType.LINK, match[1]))
-            text = split[1]
-        if len(matches) == 0:
-            processed_nodes.append(node)
-        elif text != "":
-            processed_nodes.append(TextNode(text,TextType.TEXT))
-    return processed_nodes
+    return split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+INLINE_PATTERN = (
+    r"(?=[*_`!\[])(?:"
+    r"\*\*(?P<bold>.*?)\*\*"
+    r"|_(?P<italic>[^_]*)_"
+    r"|`(?P<code>[^`]*)`"
+    r"|!\[(?P<image_alt>[^\[\]]*)\]\((?P<image_url>[^\(\)]*)\)"
+    r"|(?<!!)\[(?P<link_text>[^\[\]]*)\]\((?P<link_url>[^\(\)]*)\))"
+)
+
+INLINE_DELIMITERS = ("**", "_", "`")
 
-def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+def plain_text_node(text, strict=False):
+    if strict:
+        for delimiter in INLINE_DELIMITERS:
+            if delimiter in text:
+                raise InlineSyntaxError("There must be an even number of delimeters")
+    return TextNode(text, TextType.TEXT)
+
+def text_to_textnodes(text, strict=False, max_length=None):
+    if max_length is None:
+        max_length = DEFAULT_MAX_INLINE_LENGTH
+    if len(text) > max_length:
+        if strict:
+            raise InlineSyntaxError(f"Inline text is longer than {max_length} characters")
+        return [TextNode(text, TextType.TEXT)]
+    if text == "":
+        return [TextNode(text, TextType.TEXT)]
+    nodes = []
+    position = 0
+    for found in compiled(INLINE_PATTERN, re.DOTALL).finditer(text):
+        start = found.start()
+        if start > position:
+            nodes.append(plain_text_node(text[position:start], strict))
+        position = found.end()
+        match found.lastgroup:
+            case "bold":
+                if found["bold"] != "":
+                    nodes.append(TextNode(found["bold"], TextType.BOLD))
+            case "italic":
+                if found["italic"] != "":
+                    nodes.append(TextNode(found["italic"], TextType.ITALIC))
+            case "code":
+                if found["code"] != "":
+                    nodes.append(TextNode(found["code"], TextType.CODE))
+            case "image_url":
+                nodes.append(TextNode(found["image_alt"], TextType.IMAGE, found["image_url"]))
+            case "link_url":
+                nodes.append(TextNode(found["link_text"], TextType.LINK, found["link_url"]))
+    if position < len(text):
+        nodes.append(plain_text_node(text[position:], strict))
     return nodes
 
 def markdown_to_blocks(markdown):
-    raw_blocks = markdown.split("\n\n")
-    blocks = []
-    for block in raw_blocks:
-        if block == "\n" or block == "":
+    return list(iter_markdown_blocks(iter_string_lines(markdown)))
+
+def iter_string_lines(text):
+    start = 0
+    end = text.find("\n") + 1
+    while end > 0:
+        yield text[start:end]
+        start = end
+        end = text.find("\n", start) + 1
+    if start < len(text):
+        yield text[start:]
+
+def iter_markdown_lines(source):
+    import mmap
+    if isinstance(source, mmap.mmap):
+        for line in iter(source.readline, b""):
+            yield line.decode("utf-8")
+        return
+    for line in source:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        yield line
+
+def is_fence_toggle(line, in_fence):
+    if not line.startswith("```"):
+        return False
+    if not in_fence and len(line) >= 6 and line.endswith("```"):
+        return False
+    return True
+
+def iter_markdown_blocks(source):
+    lines = []
+    in_fence = False
+    for line in iter_markdown_lines(source):
+        stripped = line.strip()
+        if stripped == "" and not in_fence:
+            if lines:
+                yield "".join(lines).strip()
+                lines = []
             continue
-        blocks.append(block.strip())
-    return blocks
+        if is_fence_toggle(stripped, in_fence):
+            in_fence = not in_fence
+        lines.append(line)
+    if lines:
+        block = "".join(lines).strip()
+        if block != "":
+            yield block
+
+HEADING_PATTERN = r"#{1,6}\s+.+"
+QUOTE_LINE_PATTERN = r">\s?.+"
+UNORDERED_LINE_PATTERN = r"\s*[-+*]\s+.+"
+ORDERED_LINE_PATTERN = r"\s*\d+[.)]\s+.+"
+
+def all_lines_match(pattern, block):
+    start = 0
+    end = block.find("\n")
+    while end != -1:
+        if pattern.fullmatch(block, start, end) is None:
+            return False
+        start = end + 1
+        end = block.find("\n", start)
+    return pattern.fullmatch(block, start) is not None
 
 def block_to_block_type(block):
     if not block:
         return None
-    if len(re.findall(r"^(#{1,6})\s+.+$",block)) > 0:
-        return BlockType.HEADING
-    if len(re.findall(r"^```.+```$",block, re.DOTALL)) > 0:
-        return BlockType.CODE
-    if len(re.findall(r"^>\s?.+$",block, re.MULTILINE)) == len(block.split("\n")):
-        return BlockType.QUOTE
-    if len(re.findall(r"^\s*[-+*]\s+.+$",block, re.MULTILINE)) == len(block.split("\n")):
-        return BlockType.UNORDERED_LIST
-    if len(re.findall(r"^\s*\d+[.)]\s+.+$",block, re.MULTILINE)) == len(block.split("\n")):
-        return BlockType.ORDERED_LIST
+    first = block[0]
+    if first.isspace():
+        first = block.lstrip()[:1]
+    end = len(block) - block.endswith("\n")
+    if first == "#":
+        if compiled(HEADING_PATTERN).fullmatch(block, 0, end):
+            return BlockType.HEADING
+    elif first == "`":
+        if end > 6 and block.startswith("```") and block.endswith("```", 0, end):
+            return BlockType.CODE
+    elif first == ">":
+        if all_lines_match(compiled(QUOTE_LINE_PATTERN), block):
+            return BlockType.QUOTE
+    elif first in "-+*":
+        if all_lines_match(compiled(UNORDERED_LINE_PATTERN), block):
+            return BlockType.UNORDERED_LIST
+    elif first.isdigit():
+        if all_lines_match(compiled(ORDERED_LINE_PATTERN), block):
+            return BlockType.ORDERED_LIST
     return BlockType.PARAGRAPH
+
+def text_to_children(text, max_length=None):
+    return text_nodes_to_html_nodes(text_to_textnodes(text, max_length=max_length))
+
+SLUG_PATTERN = r"[^\w]+"
+DEFAULT_SLUG = "section"
+
+HEADING_TAGS = ("h1", "h2", "h3", "h4", "h5", "h6")
+
+def slugify(text):
+    return compiled(SLUG_PATTERN).sub("-", text.lower()).strip("-")
+
+def unique_slug(slug, seen):
+    count = seen.get(slug, 0)
+    candidate = slug if count == 0 else f"{slug}-{count}"
+    while count > 0 and candidate in seen:
+        count += 1
+        candidate = f"{slug}-{count}"
+    seen[slug] = count + 1
+    seen.setdefault(candidate, 1)
+    return candidate
+
+def heading_to_html_node(tag, children):
+    slug = slugify("".join(child.value for child in children)) or DEFAULT_SLUG
+    return ParentNode(tag, children, {"id": slug})
+
+def unique_heading(node, seen):
+    slug = node.props["id"]
+    unique = unique_slug(slug, seen)
+    if unique == slug:
+        return node
+    return ParentNode(node.tag, node.children, {"id": unique})
+
+def unique_headings(html_nodes):
+    seen = {}
+    for i, node in enumerate(html_nodes):
+        if node.tag in HEADING_TAGS:
+            html_nodes[i] = unique_heading(node, seen)
+    return html_nodes
+
+def list_item(line):
+    parts = line.split(None, 1)
+    return parts[1] if len(parts) > 1 else ""
+
+def block_parts(block):
+    match block_to_block_type(block):
+        case BlockType.HEADING:
+            level = len(block) - len(block.lstrip("#"))
+            return f"h{level}", None, [block[level:].strip()]
+        case BlockType.CODE:
+            return None
+        case BlockType.QUOTE:
+            lines = [line.lstrip(">").strip() for line in block.split("\n")]
+            return "blockquote", None, [" ".join(lines)]
+        case BlockType.UNORDERED_LIST:
+            return "ul", "li", list(map(list_item, block.split("\n")))
+        case BlockType.ORDERED_LIST:
+            return "ol", "li", list(map(list_item, block.split("\n")))
+        case _:
+            return "p", None, [" ".join(block.split("\n"))]
+
+def code_block_to_html_node(block):
+    code = block[3:-3]
+    if "\n" in code:
+        code = code.split("\n", 1)[1]
+    return ParentNode("pre", [LeafNode("code", code)])
+
+def parts_to_html_node(tag, item_tag, children):
+    if tag in HEADING_TAGS:
+        return heading_to_html_node(tag, children[0])
+    if item_tag is None:
+        return ParentNode(tag, children[0])
+    return ParentNode(tag, [ParentNode(item_tag, item) for item in children])
+
+def block_to_html_node(block, max_length=None):
+    parts = block_parts(block)
+    if parts is None:
+        return code_block_to_html_node(block)
+    tag, item_tag, texts = parts
+    return parts_to_html_node(tag, item_tag, [text_to_children(text, max_length) for text in texts])
+
+def convert_blocks(blocks, max_length=None):
+    parts = list(map(block_parts, blocks))
+    text_nodes = []
+    bounds = [0]
+    for part in parts:
+        if part is not None:
+            for text in part[2]:
+                text_nodes.extend(text_to_textnodes(text, max_length=max_length))
+                bounds.append(len(text_nodes))
+    leaves = text_nodes_to_html_nodes(text_nodes)
+    html_nodes = [None] * len(blocks)
+    position = 0
+    for i, part in enumerate(parts):
+        if part is None:
+            html_nodes[i] = code_block_to_html_node(blocks[i])
+            continue
+        tag, item_tag, texts = part
+        end = position + len(texts)
+        children = [leaves[bounds[j]:bounds[j + 1]] for j in range(position, end)]
+        html_nodes[i] = parts_to_html_node(tag, item_tag, children)
+        position = end
+    return html_nodes
+
+def blocks_to_html_nodes(blocks, memo=None, max_length=None):
+    if memo is None:
+        return unique_headings(convert_blocks(blocks, max_length))
+    return unique_headings(memo.blocks_to_html_nodes(blocks, max_length))
+
+def blocks_to_html(blocks, memo=None, max_length=None):
+    return "".join(html_node.to_html() for html_node in blocks_to_html_nodes(blocks, memo, max_length))
+
+def markdown_to_html_node(markdown, memo=None, max_length=None):
+    return ParentNode("div", blocks_to_html_nodes(markdown_to_blocks(markdown), memo, max_length))
+
+TERM_PATTERN = r"\w+"
+
+PROSE_TAGS = (None, "b", "i")
+
+def page_analysis(root):
+    links = []
+    images = []
+    headings = []
+    terms = Counter()
+    term_pattern = compiled(TERM_PATTERN)
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.children is not None:
+            if node.tag in HEADING_TAGS:
+                headings.append([node.props["id"], "".join(child.value for child in node.children)])
+            stack.extend(reversed(node.children))
+        elif node.tag in PROSE_TAGS:
+            terms.update(term_pattern.findall(node.value.lower()))
+        elif node.tag == "a":
+            links.append(node.props["href"])
+        elif node.tag == "img":
+            images.append(node.props["src"])
+    return {"links": links, "images": images, "headings": headings, "terms": terms}
+
+def check_markdown(markdown, max_length=None):
+    problems = []
+    for number, block in enumerate(markdown_to_blocks(markdown), 1):
+        if block_to_block_type(block) == BlockType.CODE:
+            continue
+        try:
+            text_to_textnodes(block, strict=True, max_length=max_length)
+        except InlineSyntaxError as e:
+            problems.append(f"block {number}: {e}")
+    return problems
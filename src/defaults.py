@@ -0,0 +1,11 @@
+VERSION = "0.1.0"
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_INLINE_LENGTH = 8 * 1024 * 1024
+DEFAULT_CHUNK_SIZE = 64
+DEFAULT_IO_CONCURRENCY = 16
+DEFAULT_INTERVAL = 0.1
+DEFAULT_COMPRESS_WORKERS = 4
+DEFAULT_MAX_POSTINGS = 200000
+DEFAULT_MERGE_FAN_IN = 64
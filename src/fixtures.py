@@ -0,0 +1,26 @@
+import os
+import tempfile
+import unittest
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    with open(path, "wb") as fp:
+        fp.write(data)
+
+def read_file(path):
+    with open(path, encoding="utf-8") as fp:
+        return fp.read()
+
+class SiteTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.content = self.path("content")
+        self.output = self.path("public")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, *names):
+        return os.path.join(self.directory.name, *names)
@@ -1,4 +1,13 @@
+from functools import lru_cache
+from html import escape
+
+@lru_cache(maxsize=4096)
+def render_props(items):
+    return "".join(f' {name}="{escape(str(value))}"' for name, value in items)
+
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -11,10 +20,30 @@ class HTMLNode():
     def to_html(self):
         raise NotImplementedError
 
+    def start_html(self):
+        raise NotImplementedError
+
+    def iter_html(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield node
+            elif node.children is None:
+                yield node.to_html()
+            else:
+                yield node.start_html()
+                stack.append(f"</{node.tag}>")
+                stack.extend(reversed(node.children))
+
+    def write_html(self, fp):
+        fp.writelines(self.iter_html())
+
     def props_to_html(self):
-        if self.props is None:
+        if not self.props:
             return ""
-        lines = []
-        for prop in self.props.keys():
-            lines.append(f'{prop}="{self.props[prop]}"')
-        return f' {" ".join(lines)}'
\ No newline at end of file
+        items = tuple(self.props.items())
+        try:
+            return render_props(items)
+        except TypeError:
+            return render_props.__wrapped__(items)
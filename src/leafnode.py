@@ -1,6 +1,10 @@
+from html import escape
+
 from htmlnode import HTMLNode
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         if value is None:
             raise ValueError("All leaf nodes must have a value")
@@ -13,5 +17,5 @@ class LeafNode(HTMLNode):
         if self.value is None:
             raise ValueError("All leaf nodes must have a value")
         if self.tag is None:
-            return self.value
-        return f'<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>'
\ No newline at end of file
+            return escape(self.value, quote=False)
+        return f'<{self.tag}{self.props_to_html()}>{escape(self.value, quote=False)}</{self.tag}>'
\ No newline at end of file
@@ -0,0 +1,104 @@
+import posixpath
+
+from conversion import markdown_to_html_node, page_analysis
+
+PAGE = 0
+ASSET = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS edges (
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    kind INTEGER NOT NULL,
+    PRIMARY KEY (source, target, kind)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS edges_target ON edges (target, kind);
+"""
+
+def resolve_reference(page, url):
+    url = url.split("#", 1)[0].split("?", 1)[0].strip()
+    if url == "" or url.startswith("//") or ":" in url.split("/", 1)[0]:
+        return None
+    base = "" if url.startswith("/") else posixpath.dirname(page)
+    path = posixpath.normpath(posixpath.join(base, url.lstrip("/")))
+    if path == ".." or path.startswith("../"):
+        return None
+    return path
+
+def page_target(path):
+    root, extension = posixpath.splitext(path)
+    if extension in ("", ".html", ".md"):
+        return f"{root}.md"
+    return path
+
+def analysis_references(page, analysis, urls=None):
+    links = set()
+    for url in analysis["links"]:
+        path = resolve_reference(page, url)
+        if path is not None:
+            links.add(page_target(path))
+    assets = set()
+    for url in analysis["images"]:
+        if urls:
+            url = urls.get(url, url)
+        path = resolve_reference(page, url)
+        if path is not None:
+            assets.add(path)
+    return sorted(links), sorted(assets)
+
+def page_references(page, markdown):
+    return analysis_references(page, page_analysis(markdown_to_html_node(markdown)))
+
+class LinkIndex():
+    def __init__(self, path):
+        self.path = path
+        self.connection = None
+
+    def __repr__(self):
+        return f"LinkIndex({self.path})"
+
+    def connect(self):
+        if self.connection is None:
+            import sqlite3
+            self.connection = sqlite3.connect(self.path)
+            self.connection.executescript(SCHEMA)
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def update(self, references):
+        connection = self.connect()
+        with connection:
+            for page, links, assets in references:
+                connection.execute("DELETE FROM edges WHERE source = ?", (page,))
+                connection.executemany(
+                    "INSERT INTO edges (source, target, kind) VALUES (?, ?, ?)",
+                    [(page, link, PAGE) for link in links] + [(page, asset, ASSET) for asset in assets],
+                )
+
+    def prune(self, pages, owned=None):
+        connection = self.connect()
+        known = {row[0] for row in connection.execute("SELECT DISTINCT source FROM edges")}
+        if owned is not None:
+            known = set(filter(owned, known))
+        with connection:
+            connection.executemany("DELETE FROM edges WHERE source = ?", [(page,) for page in known - set(pages)])
+
+    def targets(self, page, kind=PAGE):
+        rows = self.connect().execute("SELECT target FROM edges WHERE source = ? AND kind = ? ORDER BY target", (page, kind))
+        return [row[0] for row in rows]
+
+    def dependents(self, target, kind=PAGE):
+        rows = self.connect().execute("SELECT source FROM edges WHERE target = ? AND kind = ? ORDER BY source", (target, kind))
+        return [row[0] for row in rows]
+
+    def affected_pages(self, pages=(), assets=()):
+        affected = set(pages)
+        for page in pages:
+            affected.update(self.dependents(page, PAGE))
+        for asset in assets:
+            affected.update(self.dependents(asset, ASSET))
+        return sorted(affected)
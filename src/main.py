@@ -1,4 +1,195 @@
-from textnode import *
+import argparse
+import os
 
-tn = TextNode("example text", TextType.BOLD, "http://localhost:8888")
-print(tn)
\ No newline at end of file
+from defaults import (
+    DEFAULT_COMPRESS_WORKERS,
+    DEFAULT_INTERVAL,
+    DEFAULT_IO_CONCURRENCY,
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_ENTRIES,
+    DEFAULT_MAX_INLINE_LENGTH,
+    VERSION,
+)
+
+def positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def parse_shard(value):
+    index, _, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got {value!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {index} is not between 1 and {count}")
+    return index, count
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog="main.py")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {VERSION}")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="convert a content directory to HTML")
+    build_parser.add_argument("content", help="directory of markdown sources")
+    build_parser.add_argument("output", help="directory to write HTML pages to")
+    build_parser.add_argument("--no-cache", action="store_true", help="re-render every page (the asset manifest is still kept)")
+    build_parser.add_argument("--cache-dir", default=".cache", help="where rendered pages are cached")
+    build_parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES, help="cache size limit in bytes")
+    build_parser.add_argument("--memo-size", type=int, default=DEFAULT_MAX_ENTRIES, help="repeated blocks to keep rendered, 0 to disable")
+    build_parser.add_argument("-j", "--jobs", type=positive_int, default=1, help=f"worker processes, up to {os.cpu_count()} on this machine")
+    build_parser.add_argument("--async-io", action="store_true", help="overlap file reads and writes with conversion")
+    build_parser.add_argument("--io-concurrency", type=positive_int, default=DEFAULT_IO_CONCURRENCY, help="pages in flight with --async-io")
+    build_parser.add_argument("--profile", action="store_true", help="print per-stage timings after the build")
+    build_parser.add_argument("--profile-json", metavar="PATH", help="write per-stage timings to PATH as JSON")
+    build_parser.add_argument("--profile-top", type=int, default=10, help="slowest documents to list in the profile")
+    build_parser.add_argument("--index", metavar="PATH", help="record page links and images in the SQLite index at PATH")
+    build_parser.add_argument("--compress", action="store_true", help="write .gz sidecars, and .br when brotli is installed")
+    build_parser.add_argument("--compress-workers", type=positive_int, default=DEFAULT_COMPRESS_WORKERS, help="threads compressing sidecars")
+    build_parser.add_argument("--search", action="store_true", help="write a sharded search index to OUTPUT/search")
+    build_parser.add_argument("--shard", type=parse_shard, metavar="I/N", help="build only shard I of N and write a shard manifest for merge")
+    build_parser.add_argument("--assets", action="store_true", help="store images once by content hash and rewrite their URLs")
+    build_parser.add_argument("--template", metavar="PATH", help="layout with {{ content }} and {{ title }} slots to wrap each page in")
+    build_parser.add_argument("--max-inline-length", type=positive_int, default=DEFAULT_MAX_INLINE_LENGTH, help="longest block in characters to parse inline markup in, longer blocks stay literal text")
+    check_parser = commands.add_parser("check", help="parse markdown files and report errors without writing output")
+    check_parser.add_argument("files", nargs="+", metavar="FILE", help="markdown file to check")
+    check_parser.add_argument("--max-inline-length", type=positive_int, default=DEFAULT_MAX_INLINE_LENGTH, help="longest block in characters to parse inline markup in")
+    affected_parser = commands.add_parser("affected", help="list pages to re-render after pages or assets change")
+    affected_parser.add_argument("index", help="SQLite link index written by build --index")
+    affected_parser.add_argument("--page", action="append", default=[], help="changed, renamed or removed page, relative to the content directory")
+    affected_parser.add_argument("--asset", action="append", default=[], help="changed image, relative to the content directory")
+    merge_parser = commands.add_parser("merge", help="combine the outputs of build --shard into one site")
+    merge_parser.add_argument("output", help="directory to write HTML pages to")
+    merge_parser.add_argument("shards", nargs="+", metavar="SHARD", help="output directory of one build --shard run")
+    merge_parser.add_argument("--index", metavar="PATH", help="record page links and images from every shard in the SQLite index at PATH")
+    watch_parser = commands.add_parser("watch", help="rebuild pages as their sources change")
+    watch_parser.add_argument("content", help="directory of markdown sources")
+    watch_parser.add_argument("output", help="directory to write HTML pages to")
+    watch_parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between polls")
+    return parser
+
+def run_build(args):
+    import profiling
+    from assets import AssetStore
+    from build import build_site
+    from cache import BuildCache
+    from linkindex import LinkIndex
+    from memo import BlockMemo
+    from output import OutputStage
+    from search import SearchIndex
+    from template import load_template
+
+    cache = None if args.no_cache else BuildCache(args.cache_dir, args.cache_size)
+    memo = BlockMemo(args.memo_size) if args.memo_size > 0 else None
+    profile = args.profile or args.profile_json is not None
+    if profile:
+        profiling.enable()
+    index = None if args.index is None else LinkIndex(args.index)
+    output = OutputStage(args.compress, args.compress_workers)
+    assets = None
+    if args.assets:
+        assets = AssetStore(args.content, args.output, os.path.join(args.cache_dir, "assets"))
+    template = None
+    if args.template is not None:
+        template = load_template(args.template)
+    search = None
+    if args.search:
+        search = SearchIndex()
+    if args.async_io:
+        import asyncio
+        from build import build_site_async
+        result = asyncio.run(build_site_async(args.content, args.output, cache, memo, args.io_concurrency, index=index, output=output, search=search, shard=args.shard, template=template, assets=assets, max_length=args.max_inline_length))
+    else:
+        result = build_site(args.content, args.output, cache, memo, args.jobs, index=index, output=output, search=search, shard=args.shard, template=template, assets=assets, max_length=args.max_inline_length)
+    if index is not None:
+        index.close()
+    if args.shard is not None:
+        from shard import write_manifest
+        write_manifest(args.output, args.shard, result, assets)
+    print(result.report())
+    print(output.report())
+    if search is not None:
+        print(search.report())
+    if assets is not None:
+        print(assets.report())
+    if cache is not None:
+        print(cache.report())
+    if memo is not None:
+        print(memo.report())
+    if profile:
+        profiler = profiling.disable()
+        if args.profile:
+            print(profiler.report(args.profile_top))
+        if args.profile_json is not None:
+            with open(args.profile_json, "w", encoding="utf-8") as fp:
+                fp.write(profiler.to_json(args.profile_top))
+    return 1 if result.errors else 0
+
+def run_check(args):
+    from conversion import check_markdown
+
+    failures = 0
+    for path in args.files:
+        try:
+            with open(path, encoding="utf-8") as fp:
+                problems = check_markdown(fp.read(), args.max_inline_length)
+        except Exception as e:
+            problems = [f"{type(e).__name__}: {e}"]
+        for problem in problems:
+            print(f"{path}: {problem}")
+        if problems:
+            failures += 1
+    return 1 if failures else 0
+
+def run_affected(args):
+    from linkindex import LinkIndex
+
+    index = LinkIndex(args.index)
+    for page in index.affected_pages(args.page, args.asset):
+        print(page)
+    index.close()
+    return 0
+
+def run_merge(args):
+    from linkindex import LinkIndex
+    from shard import merge_shards
+
+    index = None if args.index is None else LinkIndex(args.index)
+    try:
+        result = merge_shards(args.output, args.shards, index)
+    finally:
+        if index is not None:
+            index.close()
+    print(result.report())
+    return 1 if result.errors else 0
+
+def run_watch(args):
+    from watch import Watcher
+
+    try:
+        Watcher(args.content, args.output, args.interval).run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+COMMANDS = {
+    "build": run_build,
+    "check": run_check,
+    "affected": run_affected,
+    "merge": run_merge,
+    "watch": run_watch,
+}
+
+def main(argv=None):
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.command == "build" and args.shard is not None and args.search:
+        parser.error("--search needs every page, run it without --shard")
+    return COMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    raise SystemExit(main())
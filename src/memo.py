@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+from conversion import block_to_html_node, convert_blocks
+from defaults import DEFAULT_MAX_ENTRIES
+
+class BlockMemo():
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.worker_entries = {}
+        self.max_length = None
+
+    def __repr__(self):
+        return f"BlockMemo({self.max_entries}, entries={len(self.entries)}, hits={self.hits}, misses={self.misses})"
+
+    def use_max_length(self, max_length):
+        if max_length != self.max_length:
+            self.entries.clear()
+            self.max_length = max_length
+
+    def block_to_html_node(self, block, max_length=None):
+        self.use_max_length(max_length)
+        node = self.entries.get(block)
+        if node is not None:
+            self.entries.move_to_end(block)
+            self.hits += 1
+            return node
+        self.misses += 1
+        node = block_to_html_node(block, max_length)
+        self.entries[block] = node
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return node
+
+    def blocks_to_html_nodes(self, blocks, max_length=None):
+        self.use_max_length(max_length)
+        entries = self.entries
+        html_nodes = [entries.get(block) for block in blocks]
+        missing = [i for i, node in enumerate(html_nodes) if node is None]
+        self.hits += len(blocks) - len(missing)
+        for block in blocks:
+            if block in entries:
+                entries.move_to_end(block)
+        if missing:
+            converted = {}
+            for i in missing:
+                converted.setdefault(blocks[i], None)
+            self.misses += len(converted)
+            self.hits += len(missing) - len(converted)
+            for block, node in zip(converted, convert_blocks(list(converted), max_length)):
+                converted[block] = node
+                entries[block] = node
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+            for i in missing:
+                html_nodes[i] = converted[blocks[i]]
+        return html_nodes
+
+    def report(self):
+        if self.worker_entries:
+            entries = f"{sum(self.worker_entries.values())} entries across {len(self.worker_entries)} workers"
+        else:
+            entries = f"{len(self.entries)} entries"
+        return f"block memo: {self.hits} hits, {self.misses} misses, {entries}"
@@ -0,0 +1,320 @@
+import gc
+import mmap
+import struct
+import sys
+from array import array
+from contextlib import contextmanager
+from html import escape
+
+from htmlnode import HTMLNode, render_props
+from leafnode import LeafNode
+from parentnode import ParentNode
+from textnode import TextNode, TextType
+
+MAGIC = b"SSGN"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<4sHBBIIII")
+
+TEXT_NODES = 0
+HTML_TREE = 1
+
+TEXT_TYPES = list(TextType)
+TEXT_TYPE_INDEX = {text_type: i for i, text_type in enumerate(TEXT_TYPES)}
+
+NODE_CLASSES = [HTMLNode, LeafNode, ParentNode]
+NODE_CLASS_INDEX = {node_class: i for i, node_class in enumerate(NODE_CLASSES)}
+
+TEXT_RECORD = 3
+HTML_RECORD = 5
+
+SEPARATED = 1
+SEPARATOR = "\0"
+
+class StringTable():
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def __repr__(self):
+        return f"StringTable({len(self.strings)} strings)"
+
+    def id(self, value):
+        if value is None:
+            return -1
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = self.ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+def little_endian(values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def pack(kind, table, records, props):
+    joined = SEPARATOR.join(table.strings)
+    if joined.count(SEPARATOR) == max(0, len(table.strings) - 1):
+        flags = SEPARATED
+        offsets = b""
+    else:
+        flags = 0
+        values = array("I", [0])
+        for value in table.strings:
+            values.append(values[-1] + len(value))
+        offsets = little_endian(values)
+        joined = "".join(table.strings)
+    blob = joined.encode("utf-8")
+    padding = b"\0" * (-len(blob) % 4)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, kind, flags, len(table.strings), len(blob) + len(padding), len(records), len(props))
+    return b"".join((header, offsets, blob, padding, little_endian(records), little_endian(props)))
+
+def dumps_text_nodes(nodes):
+    table = StringTable()
+    records = array("i")
+    for node in nodes:
+        records.extend((table.id(node.text), TEXT_TYPE_INDEX[node.text_type], table.id(node.url)))
+    return pack(TEXT_NODES, table, records, array("i"))
+
+def dumps_html(root):
+    table = StringTable()
+    records = array("i")
+    props = array("i")
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.props is None:
+            props_count = -1
+        else:
+            props_count = len(node.props)
+            for name, value in node.props.items():
+                props.extend((table.id(name), table.id(value)))
+        child_count = -1 if node.children is None else len(node.children)
+        records.extend((NODE_CLASS_INDEX[type(node)], table.id(node.tag), table.id(node.value), props_count, child_count))
+        if node.children:
+            stack.extend(reversed(node.children))
+    return pack(HTML_TREE, table, records, props)
+
+def dumps(value):
+    if isinstance(value, HTMLNode):
+        return dumps_html(value)
+    return dumps_text_nodes(value)
+
+def int_list(buffer, start, count, typecode="i"):
+    values = array(typecode)
+    values.frombytes(buffer[start:start + count * 4])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tolist()
+
+@contextmanager
+def gc_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def unpack(buffer):
+    buffer = memoryview(buffer)
+    magic, version, kind, flags, string_count, blob_size, record_count, props_count = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Not a serialized node file of a supported version")
+    position = HEADER.size
+    if flags & SEPARATED:
+        strings = str(buffer[position:position + blob_size], "utf-8").split(SEPARATOR)[:string_count]
+    else:
+        offsets = int_list(buffer, position, string_count + 1, "I")
+        position += (string_count + 1) * 4
+        text = str(buffer[position:position + blob_size], "utf-8")
+        strings = [text[offsets[i]:offsets[i + 1]] for i in range(string_count)]
+    strings.append(None)
+    position += blob_size
+    records = int_list(buffer, position, record_count)
+    position += record_count * 4
+    props = int_list(buffer, position, props_count)
+    return kind, strings, records, props
+
+def loads_text_nodes(strings, records):
+    with gc_paused():
+        return list(map(
+            TextNode,
+            map(strings.__getitem__, records[0::TEXT_RECORD]),
+            map(TEXT_TYPES.__getitem__, records[1::TEXT_RECORD]),
+            map(strings.__getitem__, records[2::TEXT_RECORD]),
+        ))
+
+class TextNodeView():
+    def __init__(self, strings, records):
+        self.strings = strings
+        self.records = records
+        self.nodes = None
+
+    def __repr__(self):
+        return f"TextNodeView({len(self)} nodes)"
+
+    def __len__(self):
+        return len(self.records) // TEXT_RECORD
+
+    def __getitem__(self, index):
+        if self.nodes is not None or not isinstance(index, int):
+            return self.materialize()[index]
+        position = range(0, len(self.records), TEXT_RECORD)[index]
+        text, text_type, url = self.records[position:position + TEXT_RECORD]
+        return TextNode(self.strings[text], TEXT_TYPES[text_type], self.strings[url])
+
+    def __iter__(self):
+        return iter(self.materialize())
+
+    def __eq__(self, other):
+        return self.materialize() == list(other)
+
+    def materialize(self):
+        if self.nodes is None:
+            self.nodes = loads_text_nodes(self.strings, self.records)
+        return self.nodes
+
+def new_node(node_class, tag, value, props):
+    node = node_class.__new__(node_class)
+    node.tag = tag
+    node.value = value
+    node.children = None
+    node.props = props
+    return node
+
+def node_props(strings, props, counts):
+    values = [None] * len(counts)
+    names = list(map(strings.__getitem__, props[0::2]))
+    settings = list(map(strings.__getitem__, props[1::2]))
+    position = 0
+    for i in [i for i, count in enumerate(counts) if count >= 0]:
+        count = counts[i]
+        if count == 1:
+            values[i] = {names[position]: settings[position]}
+        elif count == 2:
+            values[i] = {names[position]: settings[position], names[position + 1]: settings[position + 1]}
+        else:
+            values[i] = dict(zip(names[position:position + count], settings[position:position + count]))
+        position += count
+    return values
+
+def loads_html(strings, records, props):
+    if not records:
+        return None
+    with gc_paused():
+        nodes = list(map(
+            new_node,
+            map(NODE_CLASSES.__getitem__, records[0::HTML_RECORD]),
+            map(strings.__getitem__, records[1::HTML_RECORD]),
+            map(strings.__getitem__, records[2::HTML_RECORD]),
+            node_props(strings, props, records[3::HTML_RECORD]),
+        ))
+        child_counts = records[4::HTML_RECORD]
+        stack = []
+        end = len(nodes)
+        for i in reversed([i for i, count in enumerate(child_counts) if count >= 0]):
+            stack.extend(nodes[end - 1:i:-1])
+            count = child_counts[i]
+            if count:
+                children = stack[-count:]
+                del stack[-count:]
+                children.reverse()
+            else:
+                children = []
+            nodes[i].children = children
+            stack.append(nodes[i])
+            end = i
+        if end > 0:
+            stack.extend(nodes[end - 1::-1])
+    return stack[0]
+
+class HTMLTreeView():
+    def __init__(self, strings, records, props):
+        self.strings = strings
+        self.records = records
+        self.props = props
+        self.root = None
+
+    def __repr__(self):
+        return f"HTMLTreeView({len(self.records) // HTML_RECORD} nodes)"
+
+    def materialize(self):
+        if self.root is None:
+            self.root = loads_html(self.strings, self.records, self.props)
+        return self.root
+
+    def iter_html(self):
+        strings = self.strings
+        records = self.records
+        props = self.props
+        open_tags = []
+        prop = 0
+        for i in range(0, len(records), HTML_RECORD):
+            node_class, tag, value, props_count, child_count = records[i:i + HTML_RECORD]
+            node_class = NODE_CLASSES[node_class]
+            tag = strings[tag]
+            attributes = ""
+            if props_count > 0:
+                end = prop + props_count * 2
+                attributes = render_props(tuple(zip(
+                    map(strings.__getitem__, props[prop:end:2]),
+                    map(strings.__getitem__, props[prop + 1:end:2]),
+                )))
+                prop = end
+            if child_count >= 0:
+                if node_class is not ParentNode:
+                    raise NotImplementedError
+                if tag is None:
+                    raise ValueError("All parent nodes must have a tag")
+                yield f"<{tag}{attributes}>"
+                if child_count > 0:
+                    open_tags.append([tag, child_count])
+                    continue
+                yield f"</{tag}>"
+            elif node_class is LeafNode:
+                value = strings[value]
+                if value is None:
+                    raise ValueError("All leaf nodes must have a value")
+                if tag is None:
+                    yield escape(value, quote=False)
+                else:
+                    yield f"<{tag}{attributes}>{escape(value, quote=False)}</{tag}>"
+            else:
+                raise NotImplementedError
+            while open_tags:
+                open_tags[-1][1] -= 1
+                if open_tags[-1][1]:
+                    break
+                yield f"</{open_tags.pop()[0]}>"
+
+    def to_html(self):
+        return "".join(self.iter_html())
+
+    def write_html(self, fp):
+        fp.writelines(self.iter_html())
+
+def loads(buffer, lazy=False):
+    kind, strings, records, props = unpack(buffer)
+    if kind == TEXT_NODES:
+        if lazy:
+            return TextNodeView(strings, records)
+        return loads_text_nodes(strings, records)
+    if lazy:
+        return HTMLTreeView(strings, records, props)
+    return loads_html(strings, records, props)
+
+def dump(value, path):
+    with open(path, "wb") as fp:
+        fp.write(dumps(value))
+
+def load(path, lazy=False):
+    with open(path, "rb") as fp:
+        with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return loads(view, lazy)
+            finally:
+                view.release()
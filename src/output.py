@@ -0,0 +1,172 @@
+import gzip
+import os
+import threading
+import time
+
+from defaults import DEFAULT_COMPRESS_WORKERS
+
+def brotli_module():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+def gzip_compress(data):
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def brotli_compress(data):
+    return brotli_module().compress(data)
+
+def sidecar_formats():
+    formats = [(".gz", gzip_compress)]
+    if brotli_module() is not None:
+        formats.append((".br", brotli_compress))
+    return formats
+
+def read_bytes(path):
+    try:
+        with open(path, "rb") as fp:
+            return fp.read()
+    except FileNotFoundError:
+        return None
+
+def atomic_write(path, data):
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as fp:
+        fp.write(data)
+    os.replace(temp_path, path)
+
+def write_if_changed(path, data):
+    if read_bytes(path) == data:
+        return False
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, data)
+    return True
+
+SIDECAR_EXTENSIONS = (".gz", ".br")
+
+def sidecar_is_current(path, page_mtime):
+    if page_mtime is None:
+        return False
+    try:
+        return os.stat(path).st_mtime_ns >= page_mtime
+    except FileNotFoundError:
+        return False
+
+class OutputStage():
+    def __init__(self, compress=False, workers=DEFAULT_COMPRESS_WORKERS):
+        self.compress = compress
+        self.workers = workers
+        self.written = 0
+        self.unchanged = 0
+        self.bytes_written = 0
+        self.bytes_unchanged = 0
+        self.bytes_rendered = 0
+        self.seconds = 0.0
+        self.lock = threading.Lock()
+        self.executor = None
+        self.futures = []
+
+    def __repr__(self):
+        return f"OutputStage(compress={self.compress}, written={self.written}, unchanged={self.unchanged})"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["lock"] = None
+        state["executor"] = None
+        state["futures"] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def count_page(self, changed, size, seconds):
+        with self.lock:
+            if changed:
+                self.written += 1
+                self.bytes_written += size
+                self.bytes_rendered += size
+            else:
+                self.unchanged += 1
+                self.bytes_unchanged += size
+            self.seconds += seconds
+
+    def write_sidecar(self, path, data, compress):
+        start = time.perf_counter()
+        compressed = compress(data)
+        atomic_write(path, compressed)
+        with self.lock:
+            self.written += 1
+            self.bytes_written += len(compressed)
+            self.seconds += time.perf_counter() - start
+
+    def submit_sidecars(self, destination, data, changed):
+        from concurrent.futures import ThreadPoolExecutor
+
+        page_mtime = None if changed else os.stat(destination).st_mtime_ns
+        formats = sidecar_formats()
+        if len(formats) == 1 and not sidecar_is_current(f"{destination}.br", page_mtime):
+            try:
+                os.remove(f"{destination}.br")
+            except FileNotFoundError:
+                pass
+        for extension, compress in formats:
+            path = f"{destination}{extension}"
+            if sidecar_is_current(path, page_mtime):
+                continue
+            with self.lock:
+                if self.executor is None:
+                    self.executor = ThreadPoolExecutor(self.workers)
+                self.futures.append(self.executor.submit(self.write_sidecar, path, data, compress))
+
+    def remove_stale_sidecars(self, destination, changed):
+        page_mtime = None if changed else os.stat(destination).st_mtime_ns
+        for extension in SIDECAR_EXTENSIONS:
+            path = f"{destination}{extension}"
+            if not sidecar_is_current(path, page_mtime):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def write(self, destination, html):
+        start = time.perf_counter()
+        data = html.encode("utf-8")
+        changed = write_if_changed(destination, data)
+        self.count_page(changed, len(data), time.perf_counter() - start if changed else 0.0)
+        if self.compress:
+            self.submit_sidecars(destination, data, changed)
+        else:
+            self.remove_stale_sidecars(destination, changed)
+        return changed
+
+    def close(self):
+        with self.lock:
+            futures, self.futures = self.futures, []
+            executor, self.executor = self.executor, None
+        for future in futures:
+            future.result()
+        if executor is not None:
+            executor.shutdown()
+
+    def merge(self, other):
+        with self.lock:
+            self.written += other.written
+            self.unchanged += other.unchanged
+            self.bytes_written += other.bytes_written
+            self.bytes_unchanged += other.bytes_unchanged
+            self.bytes_rendered += other.bytes_rendered
+            self.seconds += other.seconds
+
+    def seconds_saved(self):
+        if self.bytes_rendered == 0:
+            return 0.0
+        return self.bytes_unchanged * self.seconds / self.bytes_rendered
+
+    def report(self):
+        return (
+            f"output: {self.written} files written ({self.bytes_written} bytes), "
+            f"{self.unchanged} unchanged, about {self.seconds_saved():.2f}s saved"
+        )
@@ -1,6 +1,8 @@
 from htmlnode import HTMLNode
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag=None, children=None, props=None):
         if tag is None or children is None:
             raise ValueError("value and tag at minimum must be specified")
@@ -10,8 +12,11 @@ class ParentNode(HTMLNode):
         return f"ParentNode({self.tag}, {self.children}, {self.props})"
 
     def to_html(self):
-        if self.tag is None:
-            raise ValueError("All parent nodes must have a tag")
         if self.children is None:
             raise ValueError("All parent nodes must have at least one child")
-        return f'<{self.tag}{self.props_to_html()}>{"".join(map(lambda child: child.to_html(), self.children))}</{self.tag}>'
\ No newline at end of file
+        return "".join(self.iter_html())
+
+    def start_html(self):
+        if self.tag is None:
+            raise ValueError("All parent nodes must have a tag")
+        return f'<{self.tag}{self.props_to_html()}>'
\ No newline at end of file
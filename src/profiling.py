@@ -0,0 +1,116 @@
+import json
+import time
+from contextlib import contextmanager
+
+import conversion
+from parentnode import ParentNode
+from template import Template
+
+active = None
+
+originals = {}
+
+STAGES = (
+    ("blocks", conversion, "markdown_to_blocks", lambda args, value: len(args[0])),
+    ("classify", conversion, "block_to_block_type", lambda args, value: len(args[0])),
+    ("inline", conversion, "text_to_textnodes", lambda args, value: len(args[0])),
+    ("nodes", conversion, "text_nodes_to_html_nodes", lambda args, value: sum(len(node.text) for node in args[0])),
+    ("serialize", ParentNode, "to_html", lambda args, value: len(value)),
+    ("layout", Template, "render", lambda args, value: len(value)),
+)
+
+def add_totals(totals, stage, calls, seconds, size):
+    entry = totals.get(stage)
+    if entry is None:
+        entry = totals[stage] = [0, 0.0, 0]
+    entry[0] += calls
+    entry[1] += seconds
+    entry[2] += size
+
+class Profiler():
+    def __init__(self):
+        self.stages = {}
+        self.documents = {}
+        self.current = None
+
+    def __repr__(self):
+        return f"Profiler({self.stages}, documents={len(self.documents)})"
+
+    def record(self, stage, seconds, size):
+        add_totals(self.stages, stage, 1, seconds, size)
+        if self.current is not None:
+            add_totals(self.current["stages"], stage, 1, seconds, size)
+
+    @contextmanager
+    def document(self, name, size):
+        stats = {"seconds": 0.0, "bytes": size, "stages": {}}
+        self.current = stats
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats["seconds"] = time.perf_counter() - start
+            self.current = None
+            self.documents[name] = stats
+
+    def merge(self, other):
+        for stage, (calls, seconds, size) in other.stages.items():
+            add_totals(self.stages, stage, calls, seconds, size)
+        self.documents.update(other.documents)
+
+    def slowest(self, count=10):
+        return sorted(self.documents.items(), key=lambda item: item[1]["seconds"], reverse=True)[:count]
+
+    def to_json(self, slowest=10):
+        return json.dumps({
+            "stages": {
+                stage: {"calls": calls, "seconds": seconds, "bytes": size}
+                for stage, (calls, seconds, size) in self.stages.items()
+            },
+            "slowest": [
+                {"document": name, **stats} for name, stats in self.slowest(slowest)
+            ],
+        }, indent=2)
+
+    def report(self, slowest=10):
+        lines = [f"{'stage':<10} {'calls':>10} {'seconds':>10} {'bytes':>12}"]
+        for stage, _, _, _ in STAGES:
+            if stage in self.stages:
+                calls, seconds, size = self.stages[stage]
+                lines.append(f"{stage:<10} {calls:>10} {seconds:>10.4f} {size:>12}")
+        if self.documents:
+            lines.append(f"slowest {min(slowest, len(self.documents))} documents:")
+            for name, stats in self.slowest(slowest):
+                lines.append(f"  {stats['seconds']:.4f}s {stats['bytes']:>10} bytes  {name}")
+        return "\n".join(lines)
+
+def timed(stage, function, size):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        value = function(*args, **kwargs)
+        active.record(stage, time.perf_counter() - start, size(args, value))
+        return value
+    return wrapper
+
+def enable():
+    global active
+    active = Profiler()
+    if not originals:
+        for stage, owner, name, size in STAGES:
+            function = getattr(owner, name)
+            originals[(owner, name)] = function
+            setattr(owner, name, timed(stage, function, size))
+    return active
+
+def disable():
+    global active
+    for (owner, name), function in originals.items():
+        setattr(owner, name, function)
+    originals.clear()
+    profiler, active = active, None
+    return profiler
+
+def take():
+    global active
+    profiler, active = active, Profiler()
+    return profiler
@@ -0,0 +1,128 @@
+import heapq
+import json
+import os
+import tempfile
+
+from conversion import markdown_to_html_node, page_analysis
+from defaults import DEFAULT_MAX_POSTINGS, DEFAULT_MERGE_FAN_IN
+from output import atomic_write
+
+SEARCH_VERSION = "2"
+
+PREFIX_LENGTH = 2
+
+def page_document(markdown):
+    analysis = page_analysis(markdown_to_html_node(markdown))
+    return {"headings": analysis["headings"], "terms": analysis["terms"]}
+
+def shard_prefix(term):
+    return term[:PREFIX_LENGTH]
+
+def write_run(directory, postings):
+    postings.sort()
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with open(fd, "w", encoding="utf-8") as fp:
+        fp.writelines(f"{term}\t{page}\t{count}\n" for term, page, count in postings)
+    return path
+
+def iter_run(path):
+    with open(path, encoding="utf-8") as fp:
+        for line in fp:
+            term, page, count = line.rstrip("\n").split("\t")
+            yield term, page, int(count)
+
+def merge_runs(directory, runs, fan_in):
+    runs = list(runs)
+    while len(runs) > fan_in:
+        batch, runs = runs[:fan_in], runs[fan_in:]
+        fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+        with open(fd, "w", encoding="utf-8") as fp:
+            fp.writelines(f"{term}\t{page}\t{count}\n" for term, page, count in heapq.merge(*map(iter_run, batch)))
+        for run in batch:
+            os.remove(run)
+        runs.append(path)
+    return heapq.merge(*map(iter_run, runs))
+
+class SearchIndex():
+    def __init__(self, max_postings=DEFAULT_MAX_POSTINGS, fan_in=DEFAULT_MERGE_FAN_IN):
+        self.max_postings = max_postings
+        self.fan_in = fan_in
+        self.pages = {}
+        self.postings = []
+        self.runs = []
+        self.temp = None
+
+    def __repr__(self):
+        return f"SearchIndex({len(self.pages)} pages, {len(self.runs)} runs)"
+
+    def add(self, page, url, document):
+        headings = document["headings"]
+        title = headings[0][1] if headings else page
+        self.pages[page] = {"url": url, "title": title, "headings": headings}
+        for term, count in document["terms"].items():
+            self.postings.append((term, page, count))
+        if len(self.postings) >= self.max_postings:
+            self.flush()
+
+    def flush(self):
+        if not self.postings:
+            return
+        if self.temp is None:
+            self.temp = tempfile.TemporaryDirectory()
+        self.runs.append(write_run(self.temp.name, self.postings))
+        self.postings = []
+
+    def write_shard(self, directory, prefix, entries):
+        path = os.path.join(directory, f"{prefix}.json")
+        atomic_write(path, json.dumps(dict(entries), separators=(",", ":")).encode("utf-8"))
+
+    def write(self, output_dir):
+        terms_dir = os.path.join(output_dir, "terms")
+        os.makedirs(terms_dir, exist_ok=True)
+        pages = sorted(self.pages)
+        ids = {page: i for i, page in enumerate(pages)}
+        if self.runs:
+            self.flush()
+            merged = merge_runs(self.temp.name, self.runs, self.fan_in)
+        else:
+            self.postings.sort()
+            merged = iter(self.postings)
+        shards = []
+        prefix = None
+        entries = []
+        term = None
+        for next_term, page, count in merged:
+            if next_term != term:
+                if shard_prefix(next_term) != prefix:
+                    if entries:
+                        self.write_shard(terms_dir, prefix, entries)
+                    prefix = shard_prefix(next_term)
+                    shards.append(prefix)
+                    entries = []
+                term = next_term
+                entries.append((term, []))
+            entries[-1][1].append([ids[page], count])
+        if entries:
+            self.write_shard(terms_dir, prefix, entries)
+        for name in os.listdir(terms_dir):
+            if name[:-len(".json")] not in shards:
+                os.remove(os.path.join(terms_dir, name))
+        manifest = {
+            "version": SEARCH_VERSION,
+            "prefix_length": PREFIX_LENGTH,
+            "pages": [self.pages[page] for page in pages],
+            "shards": shards,
+        }
+        atomic_write(os.path.join(output_dir, "index.json"), json.dumps(manifest, separators=(",", ":")).encode("utf-8"))
+        self.close()
+        return len(shards)
+
+    def close(self):
+        if self.temp is not None:
+            self.temp.cleanup()
+            self.temp = None
+        self.runs = []
+        self.postings = []
+
+    def report(self):
+        return f"search: {len(self.pages)} pages"
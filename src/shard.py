@@ -0,0 +1,74 @@
+import json
+import os
+
+from assets import ASSETS_DIR, place_file
+from build import BuildResult, html_path
+from output import SIDECAR_EXTENSIONS, atomic_write, write_if_changed
+
+MANIFEST_NAME = "shard.json"
+
+def page_files(output_dir, page):
+    path = html_path(page)
+    files = [path]
+    for extension in SIDECAR_EXTENSIONS:
+        if os.path.exists(os.path.join(output_dir, f"{path}{extension}")):
+            files.append(f"{path}{extension}")
+    return files
+
+def write_manifest(output_dir, shard, result, assets=None):
+    index, count = shard
+    pages = sorted(page for page, _, _ in result.references)
+    files = [name for page in pages for name in page_files(output_dir, page)]
+    if assets is not None:
+        files.extend(sorted(assets.used))
+    manifest = {
+        "shard": index,
+        "count": count,
+        "pages": pages,
+        "files": files,
+        "errors": sorted(result.errors),
+        "references": sorted(result.references),
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    atomic_write(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=1).encode("utf-8"))
+    return manifest
+
+def read_manifest(shard_dir):
+    with open(os.path.join(shard_dir, MANIFEST_NAME), encoding="utf-8") as fp:
+        return json.load(fp)
+
+def read_manifests(shard_dirs):
+    manifests = [read_manifest(shard_dir) for shard_dir in shard_dirs]
+    if not manifests:
+        raise ValueError("No shards to merge")
+    count = manifests[0]["count"]
+    shards = sorted(manifest["shard"] for manifest in manifests)
+    if any(manifest["count"] != count for manifest in manifests) or shards != list(range(1, count + 1)):
+        raise ValueError(f"Expected shards 1 to {count} exactly once, got {shards}")
+    return manifests
+
+def copy_file(name, source, destination):
+    if name.startswith(f"{ASSETS_DIR}/"):
+        if os.path.exists(destination):
+            return False
+        place_file(source, destination)
+        return True
+    with open(source, "rb") as fp:
+        return write_if_changed(destination, fp.read())
+
+def merge_shards(output_dir, shard_dirs, index=None):
+    result = BuildResult()
+    pages = []
+    for shard_dir, manifest in zip(shard_dirs, read_manifests(shard_dirs)):
+        for name in manifest["files"]:
+            copy_file(name, os.path.join(shard_dir, name), os.path.join(output_dir, name))
+        pages.extend(manifest["pages"])
+        result.pages += len(manifest["pages"])
+        result.errors.extend(tuple(error) for error in manifest["errors"])
+        result.references.extend((page, links, assets) for page, links, assets in manifest["references"])
+    result.errors.sort()
+    result.references.sort()
+    if index is not None:
+        index.update(result.references)
+        index.prune(pages)
+    return result
@@ -0,0 +1,63 @@
+from functools import cache
+from html import escape
+
+from conversion import HEADING_TAGS, compiled
+
+SLOT_PATTERN = r"\{\{\s*(\w+)\s*\}\}"
+
+CONTENT_SLOT = "content"
+TITLE_SLOT = "title"
+
+class Template():
+    def __init__(self, fragments, slots):
+        self.fragments = fragments
+        self.slots = slots
+
+    def __repr__(self):
+        return f"Template({len(self.fragments)} fragments, slots={self.slots})"
+
+    def iter_render(self, content, values):
+        fragments = self.fragments
+        if self.slots.count(CONTENT_SLOT) > 1:
+            content = ("".join(content),)
+        for i, slot in enumerate(self.slots):
+            yield fragments[i]
+            if slot == CONTENT_SLOT:
+                yield from content
+            else:
+                yield escape(values.get(slot) or "")
+        yield fragments[-1]
+
+    def render(self, content, values):
+        return "".join(self.iter_render(content, values))
+
+    def write(self, fp, content, values):
+        fp.writelines(self.iter_render(content, values))
+
+@cache
+def compile_template(text):
+    fragments = []
+    slots = []
+    position = 0
+    for found in compiled(SLOT_PATTERN).finditer(text):
+        fragments.append(text[position:found.start()])
+        slots.append(found[1])
+        position = found.end()
+    fragments.append(text[position:])
+    if CONTENT_SLOT not in slots:
+        raise ValueError(f"Template has no {{{{ {CONTENT_SLOT} }}}} slot")
+    return Template(fragments, slots)
+
+def load_template(path):
+    with open(path, encoding="utf-8") as fp:
+        return compile_template(fp.read())
+
+def page_title(root):
+    for node in root.children:
+        if node.tag in HEADING_TAGS:
+            return "".join(child.value for child in node.children)
+    return None
+
+def analysis_title(analysis):
+    headings = analysis["headings"]
+    return headings[0][1] if headings else None
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
+
+import assets
+from assets import AssetStore, copy_file
+from build import build_site, build_site_async
+from fixtures import SiteTestCase, read_file, write_file
+from main import main
+
+
+class TestAssets(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.store = self.path("store")
+        write_file(os.path.join(self.content, "images", "logo.png"), b"logo bytes")
+        write_file(os.path.join(self.content, "blog", "copy.png"), b"logo bytes")
+        write_file(os.path.join(self.content, "index.md"), b"# Home")
+        write_file(
+            os.path.join(self.content, "blog", "post.md"),
+            b"# Post\n\n![logo](../images/logo.png) and ![copy](copy.png)\n\n"
+            b"`![code](copy.png)` ![remote](https://example.com/a.png) ![gone](gone.png)\n\n"
+            b"```\n![fenced](copy.png)\n```",
+        )
+
+    def test_build_rewrites_image_urls(self):
+        store = AssetStore(self.content, self.output, self.store)
+        build_site(self.content, self.output, assets=store)
+        html = read_file(os.path.join(self.output, "blog", "post.html"))
+        logo = sorted(store.used)[1]
+        self.assertRegex(logo, r"^assets/logo\.[0-9a-f]{16}\.png$")
+        self.assertIn(f'<img src="../{logo}" alt="logo">', html)
+        self.assertIn('<img src="../assets/copy.', html)
+        self.assertIn("<code>![code](copy.png)</code>", html)
+        self.assertIn('src="https://example.com/a.png"', html)
+        self.assertIn('src="gone.png"', html)
+        self.assertIn("<pre><code>![fenced](copy.png)\n</code></pre>", html)
+        self.assertEqual((store.placed, store.unchanged, store.missing), (2, 0, 1))
+        objects = [name for name in os.listdir(self.store) if name != "manifest.json"]
+        self.assertEqual(len(objects), 1)
+        with open(os.path.join(self.output, logo), "rb") as fp:
+            self.assertEqual(fp.read(), b"logo bytes")
+
+    def test_unchanged_assets_cost_a_stat(self):
+        build_site(self.content, self.output, assets=AssetStore(self.content, self.output, self.store))
+        store = AssetStore(self.content, self.output, self.store)
+        with mock.patch.object(assets, "file_digest", side_effect=AssertionError("rehashed")):
+            build_site(self.content, self.output, assets=store)
+        self.assertEqual((store.placed, store.unchanged), (0, 2))
+
+    def test_changed_asset_gets_new_url_and_old_is_pruned(self):
+        build_site(self.content, self.output, assets=AssetStore(self.content, self.output, self.store))
+        before = read_file(os.path.join(self.output, "blog", "post.html"))
+        write_file(os.path.join(self.content, "images", "logo.png"), b"new logo bytes")
+        store = AssetStore(self.content, self.output, self.store)
+        build_site(self.content, self.output, assets=store, jobs=2)
+        after = read_file(os.path.join(self.output, "blog", "post.html"))
+        self.assertNotEqual(before, after)
+        self.assertEqual(store.placed, 1)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.output, "assets"))), sorted(name.split("/")[1] for name in store.used))
+
+    def test_cache_eviction_keeps_asset_store(self):
+        cache_dir = self.path("cache")
+        arguments = ["build", self.content, self.output, "--cache-dir", cache_dir, "--cache-size", "0", "--assets"]
+        with redirect_stdout(StringIO()):
+            self.assertEqual(main(arguments), 0)
+        self.assertEqual([files for _, _, files in os.walk(os.path.join(cache_dir, "pages")) if files], [])
+        store = AssetStore(self.content, self.output, os.path.join(cache_dir, "assets"))
+        self.assertEqual(len(store.load()), 2)
+        self.assertEqual(len(os.listdir(os.path.join(cache_dir, "assets"))), 2)
+        with mock.patch.object(assets, "file_digest", side_effect=AssertionError("rehashed")):
+            build_site(self.content, self.output, assets=store)
+        self.assertEqual((store.placed, store.unchanged), (0, 2))
+
+    def test_no_cache_keeps_asset_manifest(self):
+        cache_dir = self.path("cache")
+        arguments = ["build", self.content, self.output, "--cache-dir", cache_dir, "--no-cache", "--assets"]
+        with redirect_stdout(StringIO()):
+            self.assertEqual(main(arguments), 0)
+        self.assertFalse(os.path.exists(os.path.join(cache_dir, "pages")))
+        store = AssetStore(self.content, self.output, os.path.join(cache_dir, "assets"))
+        self.assertEqual(len(store.load()), 2)
+        with mock.patch.object(assets, "file_digest", side_effect=AssertionError("rehashed")):
+            build_site(self.content, self.output, assets=store)
+        self.assertEqual((store.placed, store.unchanged), (0, 2))
+
+    def test_existing_output_is_not_placed_again(self):
+        build_site(self.content, self.output, assets=AssetStore(self.content, self.output))
+        store = AssetStore(self.content, self.output)
+        with mock.patch.object(assets, "place_file", side_effect=AssertionError("placed")):
+            build_site(self.content, self.output, assets=store)
+        self.assertEqual((store.placed, store.unchanged), (0, 2))
+
+    def test_async_build_keeps_every_entry(self):
+        for i in range(40):
+            write_file(os.path.join(self.content, "many", f"image{i}.png"), f"image {i}".encode("utf-8"))
+            write_file(os.path.join(self.content, "many", f"page{i}.md"), f"![image](image{i}.png)".encode("utf-8"))
+        load = json.load
+        def slow_load(fp):
+            time.sleep(0.01)
+            return load(fp)
+        build_site(self.content, self.output, assets=AssetStore(self.content, self.output, self.store))
+        store = AssetStore(self.content, self.output, self.store)
+        with mock.patch.object(assets.json, "load", side_effect=slow_load):
+            asyncio.run(build_site_async(self.content, self.output, concurrency=8, assets=store))
+        self.assertEqual((store.placed, store.unchanged, store.missing), (0, 42, 1))
+        self.assertEqual(len(store.entries), 42)
+
+    def test_copy_file_fallbacks(self):
+        source = os.path.join(self.content, "images", "logo.png")
+        destination = self.path("copy.png")
+        with mock.patch.object(assets, "reflink", side_effect=OSError), mock.patch.object(assets, "copy_file_range", side_effect=OSError):
+            copy_file(source, destination)
+        with open(destination, "rb") as fp:
+            self.assertEqual(fp.read(), b"logo bytes")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from benchmark import compare_results, main, make_suite
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_suite_is_deterministic(self):
+        first = make_suite(0.01)
+        second = make_suite(0.01)
+        self.assertEqual(first["text_to_textnodes/link_dense"][1], second["text_to_textnodes/link_dense"][1])
+        self.assertEqual(first["markdown_to_blocks/small_files"][1], second["markdown_to_blocks/small_files"][1])
+
+    def test_compare_results(self):
+        baseline = {"fast": {"mb_per_second": 100.0}, "slow": {"mb_per_second": 100.0}, "gone": {"mb_per_second": 1.0}}
+        results = {"fast": {"mb_per_second": 95.0}, "slow": {"mb_per_second": 80.0}}
+        self.assertEqual([name for name, _ in compare_results(results, baseline, 10)], ["slow"])
+        self.assertEqual(compare_results(results, baseline, 25), [])
+
+    def test_main_save_and_compare(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            with redirect_stdout(StringIO()):
+                self.assertEqual(main(["--scale", "0.01", "--repeat", "1", "--save", path]), 0)
+            with open(path, encoding="utf-8") as fp:
+                baseline = json.load(fp)
+            self.assertIn("to_html/deep_list", baseline)
+            for result in baseline.values():
+                result["mb_per_second"] *= 1000
+            with open(path, "w", encoding="utf-8") as fp:
+                json.dump(baseline, fp)
+            with redirect_stdout(StringIO()):
+                self.assertEqual(main(["--scale", "0.01", "--repeat", "1", "--compare", path]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import time
+import unittest
+from unittest import mock
+
+import build
+from build import build_site, build_site_async, html_path, iter_markdown_files
+from cache import BuildCache
+from fixtures import SiteTestCase, read_file, write_file
+from memo import BlockMemo
+from main import main
+
+
+def write_broken_file(path):
+    with open(path, "wb") as fp:
+        fp.write(b"Not UTF-8 \xff\xfe")
+
+
+class TestBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nWelcome **home**")
+        write_file(os.path.join(self.content, "blog", "post.md"), "- one\n- two")
+        write_file(os.path.join(self.content, "notes.txt"), "not markdown")
+
+    def test_build_site(self):
+        self.assertEqual(build_site(self.content, self.output).pages, 2)
+        self.assertEqual(
+            read_file(os.path.join(self.output, "index.html")),
+            '<div><h1 id="home">Home</h1><p>Welcome <b>home</b></p></div>',
+        )
+        self.assertEqual(
+            read_file(os.path.join(self.output, "blog", "post.html")),
+            "<div><ul><li>one</li><li>two</li></ul></div>",
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.output, "notes.html")))
+
+    def test_build_site_cached(self):
+        build_cache = BuildCache(self.path("cache"))
+        build_site(self.content, self.output, build_cache)
+        build_site(self.content, self.output, build_cache)
+        self.assertEqual((build_cache.hits, build_cache.misses), (2, 2))
+
+    def test_build_site_parallel(self):
+        for i in range(20):
+            write_file(os.path.join(self.content, "many", f"page{i}.md"), f"Page _{i}_\n\nShared **footer**")
+        serial_output = self.path("serial")
+        build_site(self.content, serial_output)
+        memo = BlockMemo()
+        build_cache = BuildCache(self.path("cache"))
+        result = build_site(self.content, self.output, build_cache, memo, jobs=4, chunk_size=3)
+        self.assertEqual(result.pages, 22)
+        self.assertEqual(build_cache.misses, 22)
+        self.assertEqual(memo.hits + memo.misses, 43)
+        self.assertEqual(len(memo.entries), 0)
+        self.assertGreater(sum(memo.worker_entries.values()), 0)
+        self.assertIn(f"{sum(memo.worker_entries.values())} entries across", memo.report())
+        for relative_path in iter_markdown_files(self.content):
+            self.assertEqual(
+                read_file(os.path.join(self.output, html_path(relative_path))),
+                read_file(os.path.join(serial_output, html_path(relative_path))),
+            )
+
+    def test_build_site_collects_errors(self):
+        write_broken_file(os.path.join(self.content, "broken.md"))
+        for jobs in (1, 2):
+            result = build_site(self.content, self.output, jobs=jobs, chunk_size=1)
+            self.assertEqual(result.pages, 2)
+            self.assertEqual(len(result.errors), 1)
+            self.assertEqual(result.errors[0][0], "broken.md")
+
+    def test_build_site_async(self):
+        write_broken_file(os.path.join(self.content, "broken.md"))
+        result = asyncio.run(build_site_async(self.content, self.output, concurrency=2))
+        self.assertEqual(result.pages, 2)
+        self.assertEqual([relative_path for relative_path, _ in result.errors], ["broken.md"])
+        self.assertEqual(
+            read_file(os.path.join(self.output, "blog", "post.html")),
+            "<div><ul><li>one</li><li>two</li></ul></div>",
+        )
+
+    def test_build_site_async_overlaps_io(self):
+        for i in range(40):
+            write_file(os.path.join(self.content, "many", f"page{i}.md"), f"Page {i}")
+        read = build.read_source
+
+        def slow_read(content_dir, relative_path):
+            time.sleep(0.01)
+            return read(content_dir, relative_path)
+
+        with mock.patch("build.read_source", slow_read):
+            start = time.perf_counter()
+            build_site(self.content, self.output)
+            serial = time.perf_counter() - start
+            start = time.perf_counter()
+            result = asyncio.run(build_site_async(self.content, self.output, concurrency=16))
+            overlapped = time.perf_counter() - start
+        self.assertEqual(result.pages, 42)
+        self.assertLess(overlapped, serial / 2)
+
+    def test_build_site_max_length(self):
+        expected = "<div><h1 id=\"home\">Home</h1><p>Welcome **home**</p></div>"
+        build_cache = BuildCache(self.path("cache"))
+        build_site(self.content, self.output, build_cache)
+        for jobs in (1, 2):
+            build_site(self.content, self.output, build_cache, BlockMemo(), jobs=jobs, chunk_size=1, max_length=8)
+            self.assertEqual(read_file(os.path.join(self.output, "index.html")), expected)
+        asyncio.run(build_site_async(self.content, self.output, max_length=8))
+        self.assertEqual(read_file(os.path.join(self.output, "index.html")), expected)
+        self.assertEqual((build_cache.hits, build_cache.misses), (2, 4))
+
+    def test_main_no_cache(self):
+        cache_dir = self.path("cache")
+        main(["build", self.content, self.output, "--no-cache", "--cache-dir", cache_dir])
+        self.assertTrue(os.path.exists(os.path.join(self.output, "index.html")))
+        self.assertFalse(os.path.exists(cache_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
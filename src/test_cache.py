@@ -0,0 +1,55 @@
+import os
+import tempfile
+import unittest
+
+import cache
+from cache import BuildCache
+
+
+class TestBuildCache(unittest.TestCase):
+    def test_render_hit_and_miss(self):
+        with tempfile.TemporaryDirectory() as directory:
+            build_cache = BuildCache(directory)
+            first = build_cache.render("# Title\n\nSome **bold** text")
+            second = build_cache.render("# Title\n\nSome **bold** text")
+            self.assertEqual(first, '<div><h1 id="title">Title</h1><p>Some <b>bold</b> text</p></div>')
+            self.assertEqual(first, second)
+            self.assertEqual((build_cache.hits, build_cache.misses), (1, 1))
+            self.assertEqual(build_cache.report(), "cache: 1 hits, 1 misses")
+
+    def test_render_page_analysis(self):
+        with tempfile.TemporaryDirectory() as directory:
+            build_cache = BuildCache(directory)
+            markdown = "[a](a.md) `[b](b.md)`\n\n![c](c.png)"
+            self.assertEqual(build_cache.render_page(markdown), (build_cache.render(markdown), None))
+            html, analysis = build_cache.render_page(markdown, analyze=True)
+            self.assertEqual((analysis["links"], analysis["images"]), (["a.md"], ["c.png"]))
+            self.assertTrue(os.path.exists(build_cache.analysis_path(build_cache.key(markdown))))
+            self.assertEqual(build_cache.render_page(markdown, analyze=True), (html, analysis))
+            self.assertEqual((build_cache.hits, build_cache.misses), (3, 1))
+
+    def test_key_includes_version(self):
+        build_cache = BuildCache("unused")
+        key = build_cache.key("text")
+        original = cache.CONVERTER_VERSION
+        cache.CONVERTER_VERSION = original + "-next"
+        try:
+            self.assertNotEqual(key, build_cache.key("text"))
+        finally:
+            cache.CONVERTER_VERSION = original
+
+    def test_evict_oldest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            build_cache = BuildCache(directory, max_bytes=150)
+            old_key = build_cache.key("old")
+            new_key = build_cache.key("new")
+            build_cache.put(old_key, "x" * 100)
+            build_cache.put(new_key, "y" * 100)
+            os.utime(build_cache.path(old_key), (1, 1))
+            self.assertEqual(build_cache.evict(), 1)
+            self.assertIsNone(build_cache.get(old_key))
+            self.assertEqual(build_cache.get(new_key), "y" * 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
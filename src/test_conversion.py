@@ -1,9 +1,15 @@
+import mmap
+import random
+import tempfile
+import timeit
 import unittest
 
 from textnode import TextNode, TextType
 from htmlnode import HTMLNode
 from leafnode import LeafNode
 from conversion import *
+from memo import BlockMemo
+from benchmark import make_blocks, regex_block_to_block_type
 
 class TestTextNode(unittest.TestCase):
 
@@ -46,6 +52,55 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(leaf.props["alt"], "This is an image node")
         self.assertEqual(leaf.props["src"], "https://example.com")
 
+    def test_text_nodes_to_html_nodes(self):
+        nodes = [
+            TextNode("plain", TextType.TEXT),
+            TextNode("bold", TextType.BOLD),
+            TextNode("italic", TextType.ITALIC),
+            TextNode("code", TextType.CODE),
+            TextNode("link", TextType.LINK, "https://example.com"),
+            TextNode("alt", TextType.IMAGE, "/a.png"),
+        ]
+        batch = text_nodes_to_html_nodes(nodes)
+        single = [text_node_to_html_node(node) for node in nodes]
+        self.assertEqual(list(map(repr, batch)), list(map(repr, single)))
+        self.assertIsNone(batch[0].props)
+
+    def test_text_nodes_to_html_nodes_unknown(self):
+        with self.assertRaises(ValueError):
+            text_nodes_to_html_nodes([TextNode("x", "text")])
+
+    def test_blank_list_items(self):
+        self.assertEqual(markdown_to_html_node("- a\n-  \n- b").to_html(), "<div><ul><li>a</li><li></li><li>b</li></ul></div>")
+        self.assertEqual(markdown_to_html_node("1. a\n2.  \n3. c").to_html(), "<div><ol><li>a</li><li></li><li>c</li></ol></div>")
+
+    def test_heading_ids(self):
+        from memo import BlockMemo
+        markdown = "# Getting **Started**\n\n## Getting Started\n\n# Getting Started-1\n\n# ???"
+        expected = (
+            '<div><h1 id="getting-started">Getting <b>Started</b></h1>'
+            '<h2 id="getting-started-1">Getting Started</h2>'
+            '<h1 id="getting-started-1-1">Getting Started-1</h1>'
+            '<h1 id="section">???</h1></div>'
+        )
+        memo = BlockMemo()
+        self.assertEqual(markdown_to_html_node(markdown).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(markdown, memo).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(markdown, memo).to_html(), expected)
+        self.assertEqual(memo.entries["## Getting Started"].props, {"id": "getting-started"})
+        self.assertEqual(
+            page_analysis(markdown_to_html_node(markdown))["headings"],
+            [["getting-started", "Getting Started"], ["getting-started-1", "Getting Started"], ["getting-started-1-1", "Getting Started-1"], ["section", "???"]],
+        )
+
+    def test_blocks_to_html(self):
+        blocks = ["# Title", "Some _text_", "- a\n- b"]
+        self.assertEqual(blocks_to_html(blocks), '<h1 id="title">Title</h1><p>Some <i>text</i></p><ul><li>a</li><li>b</li></ul>')
+        self.assertEqual(
+            [node.to_html() for node in blocks_to_html_nodes(blocks)],
+            [block_to_html_node(block).to_html() for block in blocks],
+        )
+
     def test_split_node_delimiter_code(self):
         node = TextNode("This is text with a `code block` word", TextType.TEXT)
         new_nodes = split_nodes_delimiter([node], "`", TextType.CODE)
@@ -151,6 +206,92 @@ class TestTextNode(unittest.TestCase):
             new_nodes
         )
 
+    def test_text_to_textnodes_single_pass(self):
+        text = "A [link](https://a.com) then **bold** and ![img](/i.png) with _it_ and `co_de` [x](y)"
+        self.assertListEqual(
+            [
+                TextNode("A ", TextType.TEXT),
+                TextNode("link", TextType.LINK, "https://a.com"),
+                TextNode(" then ", TextType.TEXT),
+                TextNode("bold", TextType.BOLD),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("img", TextType.IMAGE, "/i.png"),
+                TextNode(" with ", TextType.TEXT),
+                TextNode("it", TextType.ITALIC),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("co_de", TextType.CODE),
+                TextNode(" ", TextType.TEXT),
+                TextNode("x", TextType.LINK, "y"),
+            ],
+            text_to_textnodes(text)
+        )
+
+    def test_text_to_textnodes_plain(self):
+        self.assertListEqual([TextNode("plain", TextType.TEXT)], text_to_textnodes("plain"))
+        self.assertListEqual([TextNode("", TextType.TEXT)], text_to_textnodes(""))
+
+    def test_text_to_textnodes_unbalanced(self):
+        self.assertListEqual(
+            [TextNode("This is **unbalanced and ", TextType.TEXT), TextNode("x", TextType.ITALIC), TextNode(" `", TextType.TEXT)],
+            text_to_textnodes("This is **unbalanced and _x_ `"),
+        )
+        with self.assertRaises(InlineSyntaxError):
+            text_to_textnodes("This is **unbalanced", strict=True)
+
+    def test_text_to_textnodes_max_length(self):
+        self.assertListEqual([TextNode("**a**", TextType.TEXT)], text_to_textnodes("**a**", max_length=4))
+        with self.assertRaises(InlineSyntaxError):
+            text_to_textnodes("**a**", strict=True, max_length=4)
+
+    def test_markdown_max_length(self):
+        markdown = "# **Title**\n\n- **a**\n- b"
+        expected = '<div><h1 id="title">**Title**</h1><ul><li>**a**</li><li>b</li></ul></div>'
+        memo = BlockMemo()
+        self.assertEqual(markdown_to_html_node(markdown, memo).to_html().count("<b>"), 2)
+        for memo in (None, memo):
+            self.assertEqual(markdown_to_html_node(markdown, memo, max_length=4).to_html(), expected)
+        self.assertEqual(check_markdown("**a**\n\n**b", max_length=4), ["block 1: Inline text is longer than 4 characters", "block 2: There must be an even number of delimeters"])
+
+    def test_text_to_textnodes_fuzz(self):
+        rng = random.Random(0)
+        alphabet = "*_`[]()!ab \n"
+        for _ in range(2000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(40)))
+            for node in text_to_textnodes(text):
+                self.assertIn(node.text_type, TextType)
+                self.assertIn(node.text, text)
+
+    def test_text_to_textnodes_linear(self):
+        cases = (
+            lambda n: "[link](https://example.com) text " * n,
+            lambda n: "![a](b) " * n,
+            lambda n: "[a" * n,
+            lambda n: "[a](" * n,
+            lambda n: "***" + "a*" * n,
+            lambda n: "_a" * n,
+            lambda n: "`" + "a" * n,
+        )
+        for make_text in cases:
+            small = min(timeit.repeat(lambda: text_to_textnodes(make_text(10000)), number=1, repeat=3))
+            large = min(timeit.repeat(lambda: text_to_textnodes(make_text(40000)), number=1, repeat=3))
+            self.assertLess(large, small * 12, make_text(2))
+
+    def test_split_nodes_link_repeated(self):
+        node = TextNode("[a](b) x [a](b) y", TextType.TEXT)
+        self.assertListEqual(
+            [
+                TextNode("a", TextType.LINK, "b"),
+                TextNode(" x ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "b"),
+                TextNode(" y", TextType.TEXT),
+            ],
+            split_nodes_link([node]),
+        )
+
+    def test_check_markdown(self):
+        md = "Fine **text**\n\n```\ncode with ** stray\n```\n\nBroken `code"
+        self.assertEqual(check_markdown(md), ["block 3: There must be an even number of delimeters"])
+
     def test_markdown_to_blocks(self):
         md = """
 This is **bolded** paragraph
@@ -199,6 +340,47 @@ This is the same paragraph on a new line
         blocks = markdown_to_blocks(md)
         self.assertEqual( blocks, [],)
 
+    def test_markdown_to_blocks_fenced_code(self):
+        md = """
+Intro paragraph
+
+```
+first line
+
+second line
+```
+
+Outro paragraph
+"""
+        blocks = markdown_to_blocks(md)
+        self.assertEqual(
+            blocks,
+            [
+                "Intro paragraph",
+                "```\nfirst line\n\nsecond line\n```",
+                "Outro paragraph",
+            ],
+        )
+        self.assertEqual(BlockType.CODE, block_to_block_type(blocks[1]))
+
+    def test_iter_markdown_blocks_file(self):
+        md = "# Heading\n\nParagraph one\nstill one\n\n\n- item\n- item\n"
+        with tempfile.TemporaryFile("w+") as fp:
+            fp.write(md)
+            fp.seek(0)
+            blocks = iter_markdown_blocks(fp)
+            self.assertEqual(next(blocks), "# Heading")
+            self.assertEqual(list(blocks), ["Paragraph one\nstill one", "- item\n- item"])
+
+    def test_iter_markdown_blocks_mmap(self):
+        md = "# Heading\n\n```\ncode\n\nmore code\n```\n"
+        with tempfile.TemporaryFile() as fp:
+            fp.write(md.encode("utf-8"))
+            fp.flush()
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                blocks = list(iter_markdown_blocks(mapped))
+        self.assertEqual(blocks, ["# Heading", "```\ncode\n\nmore code\n```"])
+
     def test_block_to_block_type_paragraph(self):
         md = """
 This is a paragraph.
@@ -278,12 +460,44 @@ This is line two.
         blocks = markdown_to_blocks(md)
         self.assertEqual(BlockType.PARAGRAPH, block_to_block_type(blocks[0]))
 
+    def test_block_to_block_type_matches_regex_classifier(self):
+        for block in make_blocks(2000) + ["#nospace", "```x```", "``", ">", "> a\n>", "-item", "1.item", "1) a\n2) b", "# Title\n", "```x```\n", "``````\n", "> a\n", "- a\n", "  - item", "  - a\n  - b", "  1. item", "  # Title", "  > a", "   ", "\n"]:
+            self.assertEqual(regex_block_to_block_type(block), block_to_block_type(block), block)
+
     def test_block_to_block_type_empty(self):
         md = ""
         blocks = markdown_to_blocks(md)
         with self.assertRaises(IndexError):
             block_to_block_type(blocks[0])
 
+    def test_markdown_to_html_node(self):
+        md = """
+# Title
+
+This is **bolded** paragraph
+text in a p
+
+```
+This is text that _should_ remain
+
+the **same** even with inline stuff
+```
+
+> A quote
+> continues
+
+1. first
+2. [second](https://boot.dev)
+"""
+        node = markdown_to_html_node(md)
+        self.assertEqual(
+            node.to_html(),
+            '<div><h1 id="title">Title</h1><p>This is <b>bolded</b> paragraph text in a p</p>'
+            "<pre><code>This is text that _should_ remain\n\nthe **same** even with inline stuff\n</code></pre>"
+            "<blockquote>A quote continues</blockquote>"
+            '<ol><li>first</li><li><a href="https://boot.dev">second</a></li></ol></div>',
+        )
+
     def test_block_to_block_type_none(self):
         md = None
         with self.assertRaises(AttributeError):
@@ -7,7 +7,18 @@ class TestTextNode(unittest.TestCase):
     def test_props_to_html(self):
         node = HTMLNode("This is a tag", value="value", props={"href":"https://www.google.com","target":"_blank"})
         self.assertEqual(node.props_to_html(),' href="https://www.google.com" target="_blank"')
-        
+
+    def test_props_to_html_escaped(self):
+        node = HTMLNode("a", props={"href": 'https://example.com/?a=1&b="2"', "title": "<x>"})
+        self.assertEqual(node.props_to_html(), ' href="https://example.com/?a=1&amp;b=&quot;2&quot;" title="&lt;x&gt;"')
+
+    def test_props_to_html_empty(self):
+        self.assertEqual(HTMLNode("p").props_to_html(), "")
+        self.assertEqual(HTMLNode("p", props={}).props_to_html(), "")
+
+    def test_props_to_html_unhashable(self):
+        node = HTMLNode("div", props={"class": ["a", "b"]})
+        self.assertEqual(node.props_to_html(), ' class="[&#x27;a&#x27;, &#x27;b&#x27;]"')
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 import unittest
 
 from leafnode import LeafNode
+from textnode import TextNode, TextType
+from conversion import text_node_to_html_node
 
 
 class TestTextNode(unittest.TestCase):
@@ -12,6 +14,17 @@ class TestTextNode(unittest.TestCase):
         node = LeafNode("a", "Link", props={"href":"https://example.com"})
         self.assertEqual(node.to_html(), '<a href="https://example.com">Link</a>')
 
+    def test_leaf_to_html_escaped(self):
+        node = LeafNode("code", 'if a < b && c > "d":')
+        self.assertEqual(node.to_html(), '<code>if a &lt; b &amp;&amp; c &gt; "d":</code>')
+        self.assertEqual(LeafNode(None, "1 < 2").to_html(), "1 &lt; 2")
+
+    def test_text_leaf_has_no_props(self):
+        node = text_node_to_html_node(TextNode("plain", TextType.TEXT))
+        self.assertIsNone(node.props)
+        self.assertFalse(hasattr(node, "__dict__"))
+        self.assertEqual(node.to_html(), "plain")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from build import build_site
+from fixtures import write_file
+from linkindex import ASSET, LinkIndex, page_references, resolve_reference
+
+
+class TestLinkIndex(unittest.TestCase):
+    def test_resolve_reference(self):
+        self.assertEqual(resolve_reference("blog/post.md", "other.md"), "blog/other.md")
+        self.assertEqual(resolve_reference("blog/post.md", "../index.html#top"), "index.html")
+        self.assertEqual(resolve_reference("blog/post.md", "/images/a.png?v=1"), "images/a.png")
+        self.assertIsNone(resolve_reference("blog/post.md", "https://boot.dev"))
+        self.assertIsNone(resolve_reference("blog/post.md", "mailto:me@example.com"))
+        self.assertIsNone(resolve_reference("blog/post.md", "#section"))
+        self.assertIsNone(resolve_reference("post.md", "../outside.md"))
+
+    def test_page_references(self):
+        markdown = "See [home](/index.html), [next](next) and [site](https://boot.dev)\n\n![logo](../images/logo.png)"
+        self.assertEqual(
+            page_references("blog/post.md", markdown),
+            (["blog/next.md", "index.md"], ["images/logo.png"]),
+        )
+
+    def test_page_references_skip_code(self):
+        markdown = "Use `[x](code.md)` or [real](real.md)\n\n```\n[fenced](fenced.md)\n![shot](shot.png)\n```"
+        self.assertEqual(page_references("post.md", markdown), (["real.md"], []))
+
+    def test_build_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            write_file(os.path.join(content, "index.md"), "[About](about.md) ![logo](images/logo.png)")
+            write_file(os.path.join(content, "about.md"), "[Home](/index.html)")
+            write_file(os.path.join(content, "blog", "post.md"), "[About](/about) ![chart](chart.png)\n\n```\n[Code](code.md)\n```")
+            index = LinkIndex(os.path.join(directory, "links.sqlite"))
+            build_site(content, os.path.join(directory, "public"), index=index)
+            self.assertEqual(index.affected_pages(["about.md"]), ["about.md", "blog/post.md", "index.md"])
+            self.assertEqual(index.affected_pages(assets=["blog/chart.png"]), ["blog/post.md"])
+            self.assertEqual(index.targets("index.md", ASSET), ["images/logo.png"])
+            self.assertEqual(index.dependents("code.md"), [])
+
+            os.remove(os.path.join(content, "blog", "post.md"))
+            write_file(os.path.join(content, "about.md"), "No links any more")
+            build_site(content, os.path.join(directory, "public"), jobs=2, index=index)
+            index.close()
+            reopened = LinkIndex(index.path)
+            self.assertEqual(reopened.affected_pages(["about.md"]), ["about.md", "index.md"])
+            self.assertEqual(reopened.affected_pages(assets=["blog/chart.png"]), [])
+            self.assertEqual(reopened.dependents("index.md"), [])
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+
+from main import main
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+class TestMain(unittest.TestCase):
+    def test_version_imports_nothing_heavy(self):
+        code = (
+            "import runpy, sys\n"
+            f"sys.argv = [{MAIN_PATH!r}, '--version']\n"
+            "try:\n"
+            f"    runpy.run_path({MAIN_PATH!r}, run_name='__main__')\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "print(sorted(m for m in ('conversion', 'build', 'asyncio', 'sqlite3', 'concurrent.futures') if m in sys.modules))\n"
+        )
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=os.path.dirname(MAIN_PATH))
+        self.assertTrue(output.stdout.startswith("main.py "))
+        self.assertEqual(output.stdout.splitlines()[-1], "[]")
+
+    def test_check(self):
+        with tempfile.TemporaryDirectory() as directory:
+            good = os.path.join(directory, "good.md")
+            bad = os.path.join(directory, "bad.md")
+            with open(good, "w", encoding="utf-8") as fp:
+                fp.write("# Fine\n\nAll **good**")
+            with open(bad, "w", encoding="utf-8") as fp:
+                fp.write("Not **fine")
+            output = StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(main(["check", good]), 0)
+                self.assertEqual(main(["check", good, bad]), 1)
+            self.assertEqual(output.getvalue(), f"{bad}: block 1: There must be an even number of delimeters\n")
+            output = StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(main(["check", good, "--max-inline-length", "8"]), 1)
+            self.assertEqual(output.getvalue(), f"{good}: block 2: Inline text is longer than 8 characters\n")
+
+    def test_build_rejects_non_positive_counts(self):
+        for option in ("--jobs", "--io-concurrency", "--compress-workers"):
+            with self.subTest(option=option), redirect_stderr(StringIO()) as error, self.assertRaises(SystemExit):
+                main(["build", "content", "public", option, "0"])
+            self.assertIn("must be at least 1", error.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+
+from conversion import markdown_to_html_node
+from memo import BlockMemo
+
+
+class TestBlockMemo(unittest.TestCase):
+    def test_repeated_blocks(self):
+        memo = BlockMemo()
+        footer = "Shared **footer** text"
+        first = markdown_to_html_node(f"# One\n\n{footer}", memo)
+        second = markdown_to_html_node(f"# Two\n\n{footer}", memo)
+        self.assertIs(first.children[1], second.children[1])
+        self.assertEqual(second.to_html(), '<div><h1 id="two">Two</h1><p>Shared <b>footer</b> text</p></div>')
+        self.assertEqual((memo.hits, memo.misses), (1, 3))
+
+    def test_max_entries(self):
+        memo = BlockMemo(max_entries=2)
+        for block in ("one", "two", "three"):
+            memo.block_to_html_node(block)
+        self.assertEqual(list(memo.entries), ["two", "three"])
+        memo.block_to_html_node("two")
+        memo.block_to_html_node("four")
+        self.assertEqual(list(memo.entries), ["two", "four"])
+        self.assertEqual(memo.report(), "block memo: 1 hits, 4 misses, 2 entries")
+
+    def test_matches_unmemoized(self):
+        md = "- a\n- b\n\n> quote\n\n- a\n- b"
+        self.assertEqual(markdown_to_html_node(md, BlockMemo()).to_html(), markdown_to_html_node(md).to_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+import nodeformat
+from conversion import markdown_to_html_node, text_to_textnodes
+from htmlnode import HTMLNode
+from leafnode import LeafNode
+from parentnode import ParentNode
+from textnode import TextNode, TextType
+
+
+class TestNodeFormat(unittest.TestCase):
+    def test_text_nodes_round_trip(self):
+        nodes = text_to_textnodes("Some **bold**, _é_ and a [link](https://boot.dev) ![img](/a.png) **bold**")
+        self.assertEqual(nodeformat.loads(nodeformat.dumps(nodes)), nodes)
+        self.assertEqual(nodeformat.loads(nodeformat.dumps([])), [])
+
+    def test_text_nodes_lazy(self):
+        nodes = text_to_textnodes("Some **bold** and `code` with [a link](/a.html)")
+        view = nodeformat.loads(nodeformat.dumps(nodes), lazy=True)
+        self.assertEqual(len(view), len(nodes))
+        self.assertEqual(view[1], nodes[1])
+        self.assertEqual(view[-1], nodes[-1])
+        self.assertIsNone(view.nodes)
+        self.assertEqual(view[1:3], nodes[1:3])
+        self.assertEqual(list(view), nodes)
+        self.assertEqual(view, nodes)
+
+    def test_strings_with_separator(self):
+        nodes = [TextNode("nul\0inside", TextType.TEXT), TextNode("", TextType.TEXT), TextNode("x", TextType.LINK, "")]
+        self.assertEqual(nodeformat.loads(nodeformat.dumps(nodes)), nodes)
+        nodes = nodes[1:]
+        self.assertEqual(nodeformat.loads(nodeformat.dumps(nodes)), nodes)
+
+    def test_html_round_trip(self):
+        node = ParentNode("div", [
+            LeafNode(None, "plain ünïcode"),
+            ParentNode("ul", [ParentNode("li", [LeafNode("a", "x", {"href": "/x"})]), ParentNode("li", [])]),
+            LeafNode("img", "", {"src": "/a.png", "alt": ""}),
+            HTMLNode("span", "base", None, {}),
+        ], {"class": "page"})
+        loaded = nodeformat.loads(nodeformat.dumps(node))
+        self.assertEqual(repr(loaded), repr(node))
+        self.assertIsInstance(loaded.children[1], ParentNode)
+        self.assertIsInstance(loaded.children[2], LeafNode)
+        self.assertEqual(loaded.children[3].props, {})
+        self.assertIsNone(loaded.children[0].props)
+
+    def test_html_lazy(self):
+        node = markdown_to_html_node("# Title\n\n- one\n- [two](/2.html) ![a & b](/a.png)\n\n```\n<code>\n```\n\n> quote")
+        view = nodeformat.loads(nodeformat.dumps(node), lazy=True)
+        self.assertIsNone(view.root)
+        self.assertEqual(view.to_html(), node.to_html())
+        self.assertEqual(repr(view.materialize()), repr(node))
+        empty = nodeformat.loads(nodeformat.dumps(ParentNode("div", [ParentNode("p", [])])), lazy=True)
+        self.assertEqual(empty.to_html(), "<div><p></p></div>")
+        with self.assertRaises(NotImplementedError):
+            nodeformat.loads(nodeformat.dumps(HTMLNode("p", "x")), lazy=True).to_html()
+
+    def test_load_mmap(self):
+        node = markdown_to_html_node("# Title\n\n- one\n- two\n\n```\ncode\n```")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "page.ssgn")
+            nodeformat.dump(node, path)
+            self.assertEqual(nodeformat.load(path).to_html(), node.to_html())
+
+    def test_bad_magic(self):
+        with self.assertRaises(ValueError):
+            nodeformat.loads(b"NOPE" + bytes(nodeformat.HEADER.size))
+
+
+if __name__ == "__main__":
+    unittest.main()
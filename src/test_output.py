@@ -0,0 +1,114 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import output
+from build import build_site
+from fixtures import write_file
+from output import OutputStage, write_if_changed
+
+
+class TestOutputStage(unittest.TestCase):
+    def test_write_if_changed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "blog", "post.html")
+            self.assertTrue(write_if_changed(path, b"<p>one</p>"))
+            os.utime(path, ns=(1, 1))
+            self.assertFalse(write_if_changed(path, b"<p>one</p>"))
+            self.assertEqual(os.stat(path).st_mtime_ns, 1)
+            self.assertTrue(write_if_changed(path, b"<p>two</p>"))
+            with open(path, "rb") as fp:
+                self.assertEqual(fp.read(), b"<p>two</p>")
+            self.assertEqual(os.listdir(os.path.dirname(path)), ["post.html"])
+
+    def test_gzip_sidecar(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.html")
+            stage = OutputStage(compress=True)
+            with mock.patch.object(output, "brotli_module", return_value=None):
+                stage.write(path, "<p>hello</p>")
+                stage.close()
+            with gzip.open(f"{path}.gz") as fp:
+                self.assertEqual(fp.read(), b"<p>hello</p>")
+            self.assertFalse(os.path.exists(f"{path}.br"))
+            self.assertEqual((stage.written, stage.unchanged), (2, 0))
+
+    def test_unchanged_page_restores_missing_sidecar(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.html")
+            with mock.patch.object(output, "brotli_module", return_value=None):
+                first = OutputStage(compress=True)
+                first.write(path, "<p>hello</p>")
+                first.close()
+                os.remove(f"{path}.gz")
+                stage = OutputStage(compress=True)
+                self.assertFalse(stage.write(path, "<p>hello</p>"))
+                stage.close()
+            self.assertTrue(os.path.exists(f"{path}.gz"))
+            self.assertEqual((stage.written, stage.unchanged), (1, 1))
+
+    def test_unchanged_page_rewrites_stale_sidecar(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.html")
+            with mock.patch.object(output, "brotli_module", return_value=None):
+                first = OutputStage(compress=True)
+                first.write(path, "<p>old</p>")
+                first.close()
+                os.utime(f"{path}.gz", ns=(1, 1))
+                self.assertTrue(OutputStage().write(path, "<p>new</p>"))
+                stage = OutputStage(compress=True)
+                self.assertFalse(stage.write(path, "<p>new</p>"))
+                stage.close()
+                again = OutputStage(compress=True)
+                again.write(path, "<p>new</p>")
+                again.close()
+            with gzip.open(f"{path}.gz") as fp:
+                self.assertEqual(fp.read(), b"<p>new</p>")
+            self.assertEqual((stage.written, stage.unchanged), (1, 1))
+            self.assertEqual((again.written, again.unchanged), (0, 1))
+
+    def test_uncompressed_rebuild_removes_stale_sidecars(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index.html")
+            first = OutputStage(compress=True)
+            first.write(path, "<p>old</p>")
+            first.close()
+            write_file(f"{path}.br", b"old")
+            self.assertFalse(OutputStage().write(path, "<p>old</p>"))
+            self.assertTrue(os.path.exists(f"{path}.gz"))
+            self.assertTrue(OutputStage().write(path, "<p>new</p>"))
+            self.assertEqual(sorted(os.listdir(directory)), ["index.html"])
+
+    def test_rebuild_skips_unchanged_pages(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            public = os.path.join(directory, "public")
+            os.makedirs(content)
+            for name in ("a", "b"):
+                with open(os.path.join(content, f"{name}.md"), "w", encoding="utf-8") as fp:
+                    fp.write(f"# {name}")
+            build_site(content, public)
+            with open(os.path.join(content, "b.md"), "w", encoding="utf-8") as fp:
+                fp.write("# changed")
+            stage = OutputStage()
+            build_site(content, public, output=stage)
+            self.assertEqual((stage.written, stage.unchanged), (1, 1))
+            self.assertEqual(stage.bytes_unchanged, len('<div><h1 id="a">a</h1></div>'))
+            self.assertIn("1 files written", stage.report())
+
+    def test_build_site_parallel_merges_counts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            os.makedirs(content)
+            for i in range(6):
+                with open(os.path.join(content, f"page{i}.md"), "w", encoding="utf-8") as fp:
+                    fp.write(f"page {i}")
+            stage = OutputStage()
+            build_site(content, os.path.join(directory, "public"), jobs=2, output=stage)
+            self.assertEqual(stage.written, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,5 @@
+import io
+import sys
 import unittest
 
 from htmlnode import HTMLNode
@@ -20,6 +22,31 @@ class TestTextNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_to_html_deep_tree(self):
+        node = LeafNode("b", "leaf")
+        for _ in range(sys.getrecursionlimit() * 2):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertTrue(html.endswith("</span></span>"))
+        self.assertIn("<b>leaf</b>", html)
+
+    def test_write_html(self):
+        items = [ParentNode("li", [LeafNode(None, f"item {i}")]) for i in range(3)]
+        parent_node = ParentNode("ul", items, {"class": "list"})
+        fp = io.StringIO()
+        parent_node.write_html(fp)
+        self.assertEqual(
+            fp.getvalue(),
+            '<ul class="list"><li>item 0</li><li>item 1</li><li>item 2</li></ul>',
+        )
+        self.assertEqual(fp.getvalue(), parent_node.to_html())
+
+    def test_to_html_no_children(self):
+        parent_node = ParentNode("div", [])
+        parent_node.children = None
+        with self.assertRaises(ValueError):
+            ParentNode("section", [parent_node]).to_html()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+import json
+import os
+import tempfile
+import unittest
+
+import conversion
+import profiling
+from build import build_site
+from conversion import markdown_to_html_node
+from main import main
+
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(profiling.active)
+        self.assertNotIn("wrapper", conversion.text_to_textnodes.__name__)
+
+    def test_stages(self):
+        profiler = profiling.enable()
+        html = markdown_to_html_node("# Title\n\nSome **bold** text").to_html()
+        profiling.disable()
+        self.assertEqual(conversion.text_to_textnodes.__name__, "text_to_textnodes")
+        self.assertEqual(profiler.stages["blocks"][0], 1)
+        self.assertEqual(profiler.stages["classify"][0], 2)
+        self.assertEqual(profiler.stages["inline"][0], 2)
+        self.assertEqual(profiler.stages["nodes"], [1, profiler.stages["nodes"][1], len("TitleSome bold text")])
+        self.assertEqual(profiler.stages["serialize"], [1, profiler.stages["serialize"][1], len(html)])
+
+    def test_template_stages(self):
+        from build import render_markdown
+        from cache import BuildCache
+        from template import compile_template
+        template = compile_template("<main>{{ content }}</main>")
+        with tempfile.TemporaryDirectory() as directory:
+            for cache in (None, BuildCache(directory)):
+                profiler = profiling.enable()
+                html, _ = render_markdown("# Title\n\ntext", cache, template=template)
+                profiling.disable()
+                body = html[len("<main>"):-len("</main>")]
+                self.assertEqual(profiler.stages["serialize"], [1, profiler.stages["serialize"][1], len(body)])
+                self.assertEqual(profiler.stages["layout"], [1, profiler.stages["layout"][1], len(html)])
+                self.assertEqual(profiler.report().count("serialize"), 1)
+
+    def test_documents(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            os.makedirs(content)
+            for name, text in (("short.md", "hi"), ("long.md", "word " * 5000)):
+                with open(os.path.join(content, name), "w", encoding="utf-8") as fp:
+                    fp.write(text)
+            profiler = profiling.enable()
+            build_site(content, os.path.join(directory, "public"))
+            self.assertEqual(sorted(profiler.documents), ["long.md", "short.md"])
+            self.assertEqual(len(profiler.slowest(1)), 1)
+            self.assertIn("slowest 2 documents:", profiler.report())
+            report = json.loads(profiler.to_json(1))
+            self.assertEqual(len(report["slowest"]), 1)
+            self.assertEqual(report["stages"]["blocks"]["calls"], 2)
+
+    def test_main_profile_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = os.path.join(directory, "content")
+            os.makedirs(content)
+            for i in range(4):
+                with open(os.path.join(content, f"page{i}.md"), "w", encoding="utf-8") as fp:
+                    fp.write(f"Page _{i}_")
+            path = os.path.join(directory, "profile.json")
+            main(["build", content, os.path.join(directory, "public"), "--no-cache", "-j", "2", "--profile-json", path])
+            with open(path, encoding="utf-8") as fp:
+                report = json.load(fp)
+            self.assertEqual(report["stages"]["inline"]["calls"], 4)
+            self.assertEqual(len(report["slowest"]), 4)
+            self.assertIsNone(profiling.active)
+
+
+if __name__ == "__main__":
+    unittest.main()
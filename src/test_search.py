@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import unittest
+from unittest import mock
+
+from build import build_site, build_site_async
+from cache import BuildCache
+from conversion import slugify
+from fixtures import SiteTestCase, write_file
+from search import SearchIndex, page_document
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+class TestSearch(SiteTestCase):
+    def test_page_document(self):
+        document = page_document(
+            "# Getting **Started**\n\nRun the _build_ [tool](/tool.html) ![logo](logo.png)\n\n"
+            "```\nbuild --secret\n```\n\n## Getting Started\n\nUse `code` to build"
+        )
+        self.assertEqual(document["headings"], [["getting-started", "Getting Started"], ["getting-started-1", "Getting Started"]])
+        self.assertEqual(document["terms"]["build"], 2)
+        self.assertEqual(document["terms"]["getting"], 2)
+        self.assertNotIn("secret", document["terms"])
+        self.assertNotIn("code", document["terms"])
+        self.assertNotIn("tool", document["terms"])
+        self.assertNotIn("logo", document["terms"])
+
+    def test_slugify(self):
+        self.assertEqual(slugify("What's new in 0.1?"), "what-s-new-in-0-1")
+
+    def test_external_merge_matches_in_memory(self):
+        pages = {f"page{i:02}.md": f"# Page {i}\n\nalpha beta {'gamma ' * i}delta{i % 3}" for i in range(30)}
+        outputs = []
+        for max_postings, fan_in in ((10 ** 6, 64), (7, 2)):
+            search = SearchIndex(max_postings=max_postings, fan_in=fan_in)
+            for page, markdown in pages.items():
+                search.add(page, page.replace(".md", ".html"), page_document(markdown))
+            output_dir = self.path(str(max_postings))
+            search.write(output_dir)
+            shards = {
+                name: read_json(os.path.join(output_dir, "terms", name))
+                for name in sorted(os.listdir(os.path.join(output_dir, "terms")))
+            }
+            outputs.append((read_json(os.path.join(output_dir, "index.json")), shards))
+        self.assertEqual(outputs[0], outputs[1])
+        manifest, shards = outputs[0]
+        self.assertEqual(manifest["shards"], sorted(manifest["shards"]))
+        self.assertEqual(sorted(shards), [f"{prefix}.json" for prefix in manifest["shards"]])
+        self.assertEqual(shards["de.json"]["delta0"], [[0, 1], [3, 1], [6, 1], [9, 1]] + [[i, 1] for i in range(12, 30, 3)])
+        self.assertEqual(shards["ga.json"]["gamma"][:2], [[1, 1], [2, 2]])
+        self.assertEqual(manifest["pages"][0], {"url": "page00.html", "title": "Page 0", "headings": [["page-0", "Page 0"]]})
+
+    def test_build_site_incremental(self):
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nWelcome home")
+        write_file(os.path.join(self.content, "blog", "zebra.md"), "# Zebra\n\nstripes")
+        cache = BuildCache(self.path("cache"))
+        build_site(self.content, self.output, cache, search=SearchIndex())
+        self.assertEqual((cache.hits, cache.misses), (0, 2))
+        self.assertTrue(os.path.exists(os.path.join(self.output, "search", "terms", "st.json")))
+        write_file(os.path.join(self.content, "blog", "zebra.md"), "# Zebra\n\nspots")
+        cache = BuildCache(cache.directory)
+        search = SearchIndex()
+        with mock.patch.object(cache, "put") as put:
+            build_site(self.content, self.output, cache, search=search)
+        self.assertEqual(put.call_count, 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.output, "search", "terms", "st.json")))
+        manifest = read_json(os.path.join(self.output, "search", "index.json"))
+        self.assertEqual([page["url"] for page in manifest["pages"]], ["blog/zebra.html", "index.html"])
+        self.assertEqual(read_json(os.path.join(self.output, "search", "terms", "sp.json")), {"spots": [[0, 1]]})
+        self.assertEqual(search.report(), "search: 2 pages")
+
+    def test_build_modes_match(self):
+        for i in range(6):
+            write_file(os.path.join(self.content, f"page{i}.md"), f"# Page {i}\n\nalpha {'beta ' * i}\n\n```\nhidden\n```")
+        outputs = []
+        for mode in ("serial", "parallel", "async"):
+            public = self.path(mode)
+            if mode == "async":
+                asyncio.run(build_site_async(self.content, public, search=SearchIndex()))
+            else:
+                build_site(self.content, public, jobs=2 if mode == "parallel" else 1, search=SearchIndex())
+            outputs.append((read_json(os.path.join(public, "search", "index.json")), sorted(os.listdir(os.path.join(public, "search", "terms")))))
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+        self.assertNotIn("hi.json", outputs[0][1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from assets import AssetStore
+from build import build_site, in_shard, shard_of
+from fixtures import SiteTestCase, write_file
+from linkindex import ASSET, LinkIndex
+from main import main
+from shard import MANIFEST_NAME, merge_shards, read_manifest
+
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def read_tree(directory):
+    files = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            with open(path, "rb") as fp:
+                files[os.path.relpath(path, directory)] = fp.read()
+    return files
+
+
+class TestShard(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(12):
+            write_file(os.path.join(self.content, f"section{i % 3}", f"page{i}.md"), f"# Page {i}\n\nSee [next](page{i + 1}.md) ![chart](chart{i % 2}.png)")
+        for i in range(2):
+            for section in range(3):
+                write_file(os.path.join(self.content, f"section{section}", f"chart{i}.png"), f"chart {i}")
+        write_file(os.path.join(self.content, "broken.md"), b"\xff\xfe")
+
+    def test_shard_of_is_stable(self):
+        self.assertEqual(shard_of("index.md", 4), shard_of("index.md", 4))
+        self.assertTrue(in_shard("index.md", None))
+        self.assertEqual(sum(in_shard("index.md", (i, 3)) for i in range(1, 4)), 1)
+
+    def test_merge_matches_single_build(self):
+        build_site(self.content, self.path("single"), assets=AssetStore(self.content, self.path("single")))
+        count = 3
+        processes = [
+            subprocess.Popen(
+                [sys.executable, MAIN_PATH, "build", self.content, self.path(f"shard{i}"), "--no-cache", "--assets", "--shard", f"{i}/{count}"],
+                stdout=subprocess.DEVNULL,
+            )
+            for i in range(1, count + 1)
+        ]
+        for process in processes:
+            process.wait()
+        shard_dirs = [self.path(f"shard{i}") for i in range(1, count + 1)]
+        self.assertEqual(sum(len(read_manifest(shard_dir)["pages"]) for shard_dir in shard_dirs), 12)
+        index = LinkIndex(self.path("links.sqlite"))
+        result = merge_shards(self.path("merged"), shard_dirs, index)
+        self.assertEqual(read_tree(self.path("merged")), read_tree(self.path("single")))
+        self.assertEqual(len(os.listdir(self.path("merged", "assets"))), 2)
+        self.assertEqual(result.pages, 12)
+        self.assertEqual([path for path, _ in result.errors], ["broken.md"])
+        self.assertEqual(index.dependents("section1/chart1.png", ASSET), ["section1/page1.md", "section1/page7.md"])
+        index.close()
+
+    def test_shards_share_index(self):
+        index = LinkIndex(self.path("links.sqlite"))
+        for i in (1, 2):
+            build_site(self.content, self.path(f"shard{i}"), index=index, shard=(i, 2))
+        pages = [f"section{i % 3}/page{i}.md" for i in range(12)]
+        self.assertEqual(sorted(page for page in pages if index.targets(page)), sorted(pages))
+        removed = next(page for page in pages if in_shard(page, (1, 2)))
+        os.remove(os.path.join(self.content, removed))
+        build_site(self.content, self.path("shard1"), index=index, shard=(1, 2))
+        self.assertEqual(sorted(page for page in pages if index.targets(page)), sorted(set(pages) - {removed}))
+        index.close()
+
+    def test_merge_rejects_missing_shard(self):
+        output = StringIO()
+        with redirect_stdout(output):
+            main(["build", self.content, self.path("shard1"), "--no-cache", "--shard", "1/2"])
+        self.assertTrue(os.path.exists(self.path("shard1", MANIFEST_NAME)))
+        with self.assertRaises(ValueError):
+            merge_shards(self.path("merged"), [self.path("shard1")])
+
+    def test_parse_shard(self):
+        with redirect_stdout(StringIO()), self.assertRaises(SystemExit):
+            main(["build", self.content, self.path("out"), "--shard", "3/2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
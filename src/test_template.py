@@ -0,0 +1,73 @@
+import os
+import unittest
+from io import StringIO
+
+from build import build_site
+from cache import BuildCache
+from conversion import markdown_to_html_node, page_analysis
+from fixtures import SiteTestCase, read_file, write_file
+from template import analysis_title, compile_template, load_template, page_title
+
+LAYOUT = "<html><head><title>{{ title }}</title></head><body>{{content}}</body></html>"
+
+
+class TestTemplate(SiteTestCase):
+    def test_compile_template(self):
+        template = compile_template(LAYOUT)
+        self.assertEqual(template.fragments, ["<html><head><title>", "</title></head><body>", "</body></html>"])
+        self.assertEqual(template.slots, ["title", "content"])
+        self.assertIs(compile_template(LAYOUT), template)
+
+    def test_compile_template_needs_content_slot(self):
+        with self.assertRaises(ValueError):
+            compile_template("<title>{{ title }}</title>")
+
+    def test_render(self):
+        template = compile_template(LAYOUT)
+        values = {"title": "Fish & Chips"}
+        self.assertEqual(
+            template.render(["<p>", "hi", "</p>"], values),
+            "<html><head><title>Fish &amp; Chips</title></head><body><p>hi</p></body></html>",
+        )
+        fp = StringIO()
+        template.write(fp, ["<p>hi</p>"], {})
+        self.assertEqual(fp.getvalue(), "<html><head><title></title></head><body><p>hi</p></body></html>")
+
+    def test_repeated_content_slot(self):
+        template = compile_template("<main>{{ content }}</main><aside>{{ content }}</aside>")
+        self.assertEqual(template.render(iter(["<p>", "hi", "</p>"]), {}), "<main><p>hi</p></main><aside><p>hi</p></aside>")
+        layout = self.path("layout.html")
+        write_file(os.path.join(self.content, "index.md"), "Welcome")
+        write_file(layout, "<main>{{ content }}</main><aside>{{ content }}</aside>")
+        build_site(self.content, self.path("plain"), template=load_template(layout))
+        build_site(self.content, self.path("cached"), BuildCache(self.path("cache")), template=load_template(layout))
+        self.assertEqual(read_file(self.path("plain", "index.html")), "<main><div><p>Welcome</p></div></main><aside><div><p>Welcome</p></div></aside>")
+        self.assertEqual(read_file(self.path("plain", "index.html")), read_file(self.path("cached", "index.html")))
+
+    def test_page_title(self):
+        markdown = "Intro text\n\n## Getting **Started**\n\n# Later"
+        self.assertEqual(page_title(markdown_to_html_node(markdown)), "Getting Started")
+        self.assertEqual(analysis_title(page_analysis(markdown_to_html_node(markdown))), "Getting Started")
+        self.assertIsNone(page_title(markdown_to_html_node("No headings here")))
+        self.assertIsNone(analysis_title(page_analysis(markdown_to_html_node("No headings here"))))
+
+    def test_build_site_with_template(self):
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        write_file(os.path.join(self.content, "about.md"), "Just text")
+        layout = self.path("layout.html")
+        write_file(layout, LAYOUT)
+        template = load_template(layout)
+        expected = '<html><head><title>Home</title></head><body><div><h1 id="home">Home</h1><p>Welcome</p></div></body></html>'
+        for name, options in (
+            ("plain", {}),
+            ("cached", {"cache": BuildCache(self.path("cache"))}),
+            ("parallel", {"jobs": 2}),
+        ):
+            output = self.path(name)
+            build_site(self.content, output, template=template, **options)
+            self.assertEqual(read_file(os.path.join(output, "index.html")), expected)
+            self.assertIn("<title></title>", read_file(os.path.join(output, "about.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
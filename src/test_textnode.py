@@ -1,6 +1,7 @@
 import unittest
 
 from textnode import TextNode, TextType
+from benchmark import bytes_per_node, DictTextNode
 
 
 class TestTextNode(unittest.TestCase):
@@ -14,6 +15,16 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(node4, node5)
         self.assertNotEqual(node, node3)
 
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
+    def test_memory_per_node(self):
+        before = bytes_per_node(lambda i: DictTextNode("text", TextType.TEXT))
+        after = bytes_per_node(lambda i: TextNode("text", TextType.TEXT))
+        print(f"\nTextNode bytes/node: {before:.1f} with __dict__, {after:.1f} slotted")
+        self.assertLess(after, before)
+
 
 if __name__ == "__main__":
     unittest.main()
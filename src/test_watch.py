@@ -0,0 +1,65 @@
+import os
+import unittest
+
+from conversion import markdown_to_html_node
+from fixtures import SiteTestCase, read_file, write_file
+from watch import Watcher
+
+
+class TestWatcher(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        write_file(os.path.join(self.content, "index.md"), "# Home\n\nFirst paragraph\n\n- one\n- two")
+        write_file(os.path.join(self.content, "blog", "post.md"), "A **post**")
+        self.watcher = Watcher(self.content, self.output)
+
+    def edit(self, relative_path, markdown):
+        path = os.path.join(self.content, relative_path)
+        write_file(path, markdown)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_initial_build(self):
+        changes = self.watcher.poll()
+        self.assertEqual(sorted(path for path, _, _ in changes), [os.path.join("blog", "post.md"), "index.md"])
+        self.assertEqual(self.watcher.rendered_blocks, 4)
+        self.assertEqual(self.watcher.poll(), [])
+
+    def test_only_changed_blocks_render(self):
+        self.watcher.poll()
+        markdown = "# Home\n\nEdited _paragraph_\n\n- one\n- two"
+        self.edit("index.md", markdown)
+        changes = self.watcher.poll()
+        self.assertEqual([(path, message) for path, _, message in changes], [("index.md", None)])
+        self.assertEqual(self.watcher.rendered_blocks, 5)
+        self.assertEqual(
+            read_file(os.path.join(self.output, "index.html")),
+            markdown_to_html_node(markdown).to_html(),
+        )
+
+    def test_duplicate_headings(self):
+        self.watcher.poll()
+        markdown = "# Home\n\ntext\n\n# Home"
+        self.edit("index.md", markdown)
+        self.watcher.poll()
+        self.assertEqual(
+            read_file(os.path.join(self.output, "index.html")),
+            markdown_to_html_node(markdown).to_html(),
+        )
+        self.assertIn('id="home-1"', read_file(os.path.join(self.output, "index.html")))
+
+    def test_errors_and_removals(self):
+        self.watcher.poll()
+        with open(os.path.join(self.content, "index.md"), "wb") as fp:
+            fp.write(b"Not UTF-8 \xff\xfe")
+        os.utime(os.path.join(self.content, "index.md"), ns=(0, 1))
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        changes = {path: message for path, _, message in self.watcher.poll()}
+        self.assertTrue(changes["index.md"].startswith("UnicodeDecodeError"))
+        self.assertEqual(changes[os.path.join("blog", "post.md")], "removed")
+        self.assertFalse(os.path.exists(os.path.join(self.output, "blog", "post.html")))
+        self.assertEqual(self.watcher.poll(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import time
+
+from build import html_path, iter_markdown_files, read_source, write_page
+from conversion import HEADING_TAGS, block_to_html_node, markdown_to_blocks, unique_heading
+from defaults import DEFAULT_INTERVAL
+
+class PageState():
+    def __init__(self, signature, fragments):
+        self.signature = signature
+        self.fragments = fragments
+
+    def __repr__(self):
+        return f"PageState({self.signature}, {len(self.fragments)} blocks)"
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+class Watcher():
+    def __init__(self, content_dir, output_dir, interval=DEFAULT_INTERVAL):
+        self.content_dir = content_dir
+        self.output_dir = output_dir
+        self.interval = interval
+        self.pages = {}
+        self.rendered_blocks = 0
+
+    def __repr__(self):
+        return f"Watcher({self.content_dir}, {self.output_dir}, {len(self.pages)} pages)"
+
+    def render_fragments(self, markdown, previous):
+        fragments = []
+        for block in markdown_to_blocks(markdown):
+            fragment = previous.get(block)
+            if fragment is None:
+                node = block_to_html_node(block)
+                fragment = (node, node.to_html())
+                self.rendered_blocks += 1
+            fragments.append((block, fragment))
+        return fragments
+
+    def page_html(self, fragments):
+        pieces = []
+        seen = {}
+        for _, (node, html) in fragments:
+            if node.tag in HEADING_TAGS:
+                heading = unique_heading(node, seen)
+                if heading is not node:
+                    html = heading.to_html()
+            pieces.append(html)
+        return f"<div>{''.join(pieces)}</div>"
+
+    def rebuild_page(self, relative_path, signature):
+        state = self.pages.get(relative_path)
+        previous = dict(state.fragments) if state is not None else {}
+        markdown = read_source(self.content_dir, relative_path)
+        fragments = self.render_fragments(markdown, previous)
+        write_page(self.output_dir, relative_path, self.page_html(fragments))
+        self.pages[relative_path] = PageState(signature, fragments)
+
+    def remove_page(self, relative_path):
+        del self.pages[relative_path]
+        try:
+            os.remove(os.path.join(self.output_dir, html_path(relative_path)))
+        except FileNotFoundError:
+            pass
+
+    def poll(self):
+        changes = []
+        seen = set()
+        for relative_path in iter_markdown_files(self.content_dir):
+            seen.add(relative_path)
+            try:
+                signature = file_signature(os.path.join(self.content_dir, relative_path))
+            except FileNotFoundError:
+                continue
+            state = self.pages.get(relative_path)
+            if state is not None and state.signature == signature:
+                continue
+            start = time.perf_counter()
+            try:
+                self.rebuild_page(relative_path, signature)
+            except Exception as e:
+                self.pages[relative_path] = PageState(signature, state.fragments if state is not None else [])
+                changes.append((relative_path, time.perf_counter() - start, f"{type(e).__name__}: {e}"))
+            else:
+                changes.append((relative_path, time.perf_counter() - start, None))
+        for relative_path in sorted(set(self.pages) - seen):
+            start = time.perf_counter()
+            self.remove_page(relative_path)
+            changes.append((relative_path, time.perf_counter() - start, "removed"))
+        return changes
+
+    def run(self):
+        first = True
+        while True:
+            start = time.perf_counter()
+            changes = self.poll()
+            if first:
+                print(f"built {len(changes)} pages in {(time.perf_counter() - start) * 1000:.1f} ms, watching {self.content_dir}")
+                first = False
+            else:
+                for relative_path, seconds, message in changes:
+                    suffix = "" if message is None else f" ({message})"
+                    print(f"rebuilt {relative_path} in {seconds * 1000:.1f} ms{suffix}")
+            time.sleep(self.interval)